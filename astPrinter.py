@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 
-from token import Token
+from loxToken import Token
 from expr import *
 from tokenType import TokenType
 
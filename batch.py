@@ -0,0 +1,98 @@
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+# The options of the Lox that started the batch, copied onto the Lox made
+# for each script, and the program cache the worker's scripts share. Set in
+# each worker by warmUp().
+settings = None
+cache = None
+
+# Runs on every engine, so it uses no functions.
+WARMUP = ('var a = 1; while (a < 3) a = a + 1; print a * 2 - 1 / 2;'
+          'print "a" + "b" == "ab" and !nil or 1 >= 2;')
+
+
+def findScripts(directory):
+    scripts = []
+    for root, directories, files in os.walk(directory):
+        directories.sort()
+        for name in sorted(files):
+            if name.endswith(".lox"):
+                scripts.append(os.path.join(root, name))
+    return scripts
+
+
+def warmUp(options):
+    # Runs once per worker process: imports every module the engine needs
+    # and fills the per-process tables (operator handlers, the cache codec,
+    # formatted numbers), so that no script pays for them.
+    global settings, cache
+    settings = options
+    lox = newLox()
+    with contextlib.redirect_stdout(io.StringIO()):
+        lox.run(WARMUP)
+    if options["cache"]:
+        from programCache import ProgramCache
+        cache = ProgramCache()
+        cache.getCodec()
+        cache.version()
+
+
+def newLox():
+    from lox import Lox
+
+    lox = Lox(settings["engine"])
+    lox.optimize = settings["optimize"]
+    lox.memoSize = settings["memoSize"]
+    lox.asyncMode = settings["asyncMode"]
+    lox.lineBuffered = False
+    lox.cache = cache
+    return lox
+
+
+def runScript(path):
+    # The exit code is the one lox.py would exit with for this script
+    # alone: 0, 65 for a compile error, 70 for a runtime error, or 1 with
+    # a traceback if the interpreter itself failed.
+    lox = newLox()
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            lox.runFile(path)
+            exitCode = 0
+        except SystemExit as exit:
+            exitCode = exit.code
+        except Exception:
+            traceback.print_exc()
+            exitCode = 1
+    seconds = time.perf_counter() - start
+    return {"script": path, "exitCode": exitCode, "seconds": seconds,
+            "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+
+def runBatch(lox, directory, jobs):
+    # Runs every .lox file under directory on a pool of jobs warm worker
+    # processes and prints one JSON object per script, in path order.
+    # Exits 0 if every script exited 0, and 1 otherwise.
+    scripts = findScripts(directory)
+    options = {"engine": lox.engine, "optimize": lox.optimize,
+               "memoSize": lox.memoSize, "asyncMode": lox.asyncMode,
+               "cache": lox.cache is not None}
+
+    failed = 0
+    with ProcessPoolExecutor(jobs, initializer=warmUp,
+                             initargs=(options,)) as pool:
+        for result in pool.map(runScript, scripts):
+            if result["exitCode"] != 0:
+                failed += 1
+            sys.stdout.write(json.dumps(result) + "\n")
+            sys.stdout.flush()
+    sys.exit(1 if failed else 0)
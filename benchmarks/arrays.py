@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from lox import Lox
+import loxArray
+
+SIZE = 100000
+
+# The same sum of squares, one interpreted loop iteration per element and
+# then as whole-array operations.
+SCALAR = ("var total = 0;\n"
+          "for (var i = 0; i < %d; i = i + 1) total = total + i * i;\n"
+          "print total;\n" % SIZE)
+VECTOR = ("var a = range(%d);\n"
+          "print sum(a * a);\n" % SIZE)
+
+
+def run(engine, source):
+    lox = Lox(engine)
+    statements = lox.compile(source)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        lox.execute(statements)
+        return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    engines = sys.argv[1:] or ["tree", "closure"]
+    backend = "numpy" if loxArray.load() is not None else "array('d')"
+    print("%d elements, arrays backed by %s" % (SIZE, backend))
+    for engine in engines:
+        scalar = min(run(engine, SCALAR) for repeat in range(3))
+        vector = min(run(engine, VECTOR) for repeat in range(3))
+        print("%-8s loop %8.2f ms  arrays %8.2f ms  (%.0fx)" %
+              (engine, scalar * 1000, vector * 1000, scalar / vector))
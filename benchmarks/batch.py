@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+LOX = os.path.join(HERE, "..", "lox.py")
+
+SCRIPTS = 200
+# A short script, like most of a nightly run: startup dominates.
+SOURCE = ("var total = 0;\n"
+          "for (var i = 0; i < %d; i = i + 1) total = total + i;\n"
+          "print total;\n")
+
+
+def timed(command):
+    start = time.perf_counter()
+    subprocess.run(command, stdout=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    jobs = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    directory = tempfile.mkdtemp()
+    scripts = []
+    for index in range(SCRIPTS):
+        path = os.path.join(directory, "script%03d.lox" % index)
+        file = open(path, "w")
+        file.write(SOURCE % (100 + index))
+        file.close()
+        scripts.append(path)
+
+    start = time.perf_counter()
+    for script in scripts:
+        subprocess.run([sys.executable, LOX, script],
+                       stdout=subprocess.DEVNULL, check=True)
+    separate = time.perf_counter() - start
+    batch = timed([sys.executable, LOX, "--batch", directory, "-j", "1"])
+    parallel = timed([sys.executable, LOX, "--batch", directory,
+                      "-j", str(jobs)])
+
+    print("%d scripts" % SCRIPTS)
+    print("one process each     %8.1f ms" % (separate * 1000))
+    print("--batch -j 1         %8.1f ms" % (batch * 1000))
+    print("--batch -j %-2d        %8.1f ms" % (jobs, parallel * 1000))
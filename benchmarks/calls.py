@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from lox import Lox
+
+# Each program prints nothing but a result and makes a known number of Lox
+# calls, so the time per call includes argument evaluation and the return.
+PROGRAMS = {
+    # fib(n) makes 2 * fib(n + 1) - 1 calls; fib(21) is 10946.
+    "fib": ("fun fib(n) { if (n < 2) return n; return fib(n - 1) + fib(n - 2); }\n"
+            "print fib(20);\n", 2 * 10946 - 1),
+    # Tail calls back and forth between two functions.
+    "mutual": ("fun isEven(n) { if (n == 0) return true; return isOdd(n - 1); }\n"
+               "fun isOdd(n) { if (n == 0) return false; return isEven(n - 1); }\n"
+               "print isEven(20000);\n", 20001),
+    # A self tail call with an accumulator.
+    "tail": ("fun sum(n, acc) { if (n == 0) return acc; return sum(n - 1, acc + n); }\n"
+             "print sum(20000, 0);\n", 20001),
+    # A non-tail call in a loop.
+    "loop": ("fun add(a, b) { return a + b; }\n"
+             "var x = 0;\n"
+             "for (var i = 0; i < 20000; i = i + 1) x = add(x, i);\n"
+             "print x;\n", 20000),
+}
+
+
+def run(engine, source):
+    # Memoization would skip most of the calls being timed.
+    lox = Lox(engine)
+    lox.memoSize = 0
+    statements = lox.compile(source)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        lox.execute(statements)
+        return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    engines = sys.argv[1:] or ["tree", "closure", "vm"]
+    print("%-8s %-8s %12s" % ("program", "engine", "calls/s"))
+    for name, (source, calls) in PROGRAMS.items():
+        for engine in engines:
+            seconds = min(run(engine, source) for repeat in range(5))
+            print("%-8s %-8s %12.0f" % (name, engine, calls / seconds))
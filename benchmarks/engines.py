@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from lox import Lox
+
+FIBONACCI = """
+var round = 0;
+while (round < 2000) {
+    var a = 0;
+    var temp;
+    for (var b = 1; a < 10000; b = temp + b) {
+        print a;
+        temp = a;
+        a = b;
+    }
+    round = round + 1;
+}
+"""
+
+COUNTER = """
+var total = 0;
+for (var i = 0; i < 100000; i = i + 1) {
+    if (i / 2 > 10 and i != 7) total = total + i * 2 - 1;
+    else total = total - 1;
+}
+print total;
+"""
+
+WORKLOADS = {
+    "fibonacci": FIBONACCI,
+    "counter": COUNTER,
+}
+
+
+def run(engine, source):
+    lox = Lox(engine)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        start = time.perf_counter()
+        lox.run(source)
+        elapsed = time.perf_counter() - start
+    return elapsed, output.getvalue()
+
+
+if __name__ == "__main__":
+    engines = sys.argv[1:] or list(Lox.engines)
+    print("%-10s" % "workload" + "".join("%10s" % engine for engine in engines))
+    for name, source in WORKLOADS.items():
+        outputs = set()
+        row = "%-10s" % name
+        for engine in engines:
+            results = [run(engine, source) for repeat in range(3)]
+            elapsed = min(result[0] for result in results)
+            outputs.add(results[0][1])
+            row += "%9.3fs" % elapsed
+        if len(outputs) != 1:
+            row += "  OUTPUT MISMATCH"
+        print(row)
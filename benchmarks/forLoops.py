@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from lox import Lox
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+ITERATIONS = 100000
+
+# test.lox as shipped prints every Fibonacci number below 10000, and again
+# with the bound raised to 1e300 so that its loop runs longer. The other two
+# loops have a body that declares nothing and one that declares a local.
+# Each case is (name, source, times to run it per measurement).
+source = open(os.path.join(ROOT, "test.lox")).read()
+CASES = [
+    ("test.lox", source, 500),
+    ("test.lox 1e300", source.replace("10000", "1" + "0" * 300), 10),
+    ("empty body", "var n = 0;\n"
+     "for (var i = 0; i < %d; i = i + 1) { n = n + 1; }\n" % ITERATIONS, 1),
+    ("local in body", "var n = 0;\n"
+     "for (var i = 0; i < %d; i = i + 1) { var j = i; n = n + j; }\n"
+     % ITERATIONS, 1),
+]
+
+
+def run(engine, source, repeats):
+    # Returns (iterations, seconds) for running source repeats times; a
+    # program's iteration count is taken from the output of test.lox, which
+    # prints once per iteration, and is ITERATIONS otherwise.
+    lox = Lox(engine)
+    statements = lox.compile(source)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        start = time.perf_counter()
+        for repeat in range(repeats):
+            lox.execute(statements)
+        seconds = time.perf_counter() - start
+    lines = output.getvalue().count("\n")
+    return (lines or ITERATIONS * repeats), seconds
+
+
+if __name__ == "__main__":
+    engines = sys.argv[1:] or list(Lox.engines)
+    print("%-8s %-16s %14s" % ("engine", "loop", "iterations/s"))
+    for engine in engines:
+        for name, source, repeats in CASES:
+            best = min(run(engine, source, repeats) for attempt in range(3))
+            print("%-8s %-16s %14.0f" % (engine, name, best[0] / best[1]))
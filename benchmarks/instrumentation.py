@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+
+import contextlib
+import io
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from lox import Lox
+
+
+def execute(coverage, source):
+    lox = Lox()
+    if coverage:
+        lox.coveragePath = os.devnull
+    statements = lox.compile(source)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        lox.execute(statements)
+        return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    name = sys.argv[1] if len(sys.argv) > 1 else "fibonacci"
+    file = open(os.path.join(HERE, "lox", name + ".lox"))
+    source = file.read()
+    file.close()
+
+    plain = min(execute(False, source) for repeat in range(5))
+    counted = min(execute(True, source) for repeat in range(5))
+    print("%s: %.3fs plain, %.3fs counting (%.2fx)" %
+          (name, plain, counted, counted / plain))
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from lox import Lox
+
+# Naive recursive fib is proved pure, so with memoization each fib(k) is
+# computed once and the time grows linearly in n instead of exponentially.
+SOURCE = ("fun fib(n) { if (n < 2) return n; return fib(n - 1) + fib(n - 2); }\n"
+          "print fib(%d);\n")
+
+
+def run(n, memoSize):
+    lox = Lox()
+    lox.memoSize = memoSize
+    statements = lox.compile(SOURCE % n)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        lox.execute(statements)
+        return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    print("%4s %12s %12s" % ("n", "plain ms", "memo ms"))
+    for n in (10, 15, 20, 25, 200, 800):
+        plain = min(run(n, 0) for repeat in range(3)) if n <= 25 else None
+        memo = min(run(n, 1024) for repeat in range(3))
+        print("%4d %12s %12.3f" %
+              (n, "-" if plain is None else "%.3f" % (plain * 1000),
+               memo * 1000))
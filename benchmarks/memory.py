@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from regexScanner import RegexScanner
+from parser import Parser
+from optimizer import countNodes
+
+CHUNK = """var total = 0;
+for (var i = 0; i < 1000; i = i + 1) {
+    if (i >= 10 and i != 500 or !(i <= 3)) total = total + i * 2.5 / 7;
+    else { var name = "x"; total = total - (1 + 2); }
+}
+print total;
+"""
+
+
+class Sink:
+    def error(self, line, message):
+        raise RuntimeError(message)
+
+    def error2(self, token, message):
+        raise RuntimeError(message)
+
+
+def allocated(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+if __name__ == "__main__":
+    source = CHUNK * (int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
+
+    tokens, tokenBytes = allocated(
+        lambda: RegexScanner(source, Sink()).scanTokens())
+    statements, nodeBytes = allocated(lambda: Parser(tokens, Sink()).parse())
+    nodes = countNodes(statements)
+
+    print("tokens: %8d %10d bytes %6.1f bytes/token" %
+          (len(tokens), tokenBytes, tokenBytes / len(tokens)))
+    print("nodes:  %8d %10d bytes %6.1f bytes/node" %
+          (nodes, nodeBytes, nodeBytes / nodes))
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from lox import Lox
+
+ACCESSES = 8
+
+
+def generate(depth, iterations):
+    source = "var total = 0;\n"
+    source += "{\n  var outer = 1;\n"
+    source += "  for (var i = 0; i < " + str(iterations) + "; i = i + 1) {\n"
+    for level in range(depth):
+        source += "    " * (level + 1) + "{ var v" + str(level) + " = " + str(level) + ";\n"
+    for access in range(ACCESSES):
+        source += "    " * (depth + 1) + "outer = outer + v0;\n"
+    source += "  " + "}" * depth + "\n"
+    source += "  }\n  total = outer;\n}\nprint total;\n"
+    return source
+
+
+def run(source):
+    lox = Lox()
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        lox.run(source)
+        return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print("depth  seconds  accesses/s")
+    for depth in (1, 4, 8, 16, 32):
+        elapsed = min(run(generate(depth, iterations)) for repeat in range(3))
+        print("%5d  %7.3f  %10.0f" % (depth, elapsed, iterations * ACCESSES * 3 / elapsed))
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from lox import Lox
+
+ITERATIONS = 5000
+WIDTH = 40
+
+# Each entry builds an expression containing WIDTH extra nodes of one kind.
+# The per-node cost is the time difference against the narrow expression.
+NODES = {
+    "add+literal": lambda width: " + ".join(["1"] * (width + 1)),
+    "add+variable": lambda width: " + ".join(["x"] * (width + 1)),
+    "grouping": lambda width: "(" * width + "x" + ")" * width,
+    "unary": lambda width: "-" * width + "x",
+    "and+variable": lambda width: " and ".join(["x"] * (width + 1)),
+    "and+less": lambda width: " and ".join(["x < 2"] * (width + 1)),
+}
+
+
+def program(expression):
+    return ("var x = 1;\nvar y;\nfor (var i = 0; i < " + str(ITERATIONS) +
+            "; i = i + 1) y = " + expression + ";\n")
+
+
+def run(engine, source):
+    lox = Lox(engine)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        lox.run(source)
+        return time.perf_counter() - start
+
+
+def perNode(engine, build):
+    narrow = min(run(engine, program(build(0))) for repeat in range(3))
+    wide = min(run(engine, program(build(WIDTH))) for repeat in range(3))
+    return (wide - narrow) / (ITERATIONS * WIDTH) * 1e9
+
+
+if __name__ == "__main__":
+    engines = sys.argv[1:] or ["tree", "closure"]
+    print("%-13s" % "node (ns)" + "".join("%10s" % engine for engine in engines))
+    for name, build in NODES.items():
+        print("%-13s" % name +
+              "".join("%10.0f" % perNode(engine, build) for engine in engines))
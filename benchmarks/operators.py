@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from lox import Lox
+
+ITERATIONS = 20000
+WIDTH = 10
+
+OPERATORS = ["+", "-", "*", "/", "<", "<=", ">", ">=", "==", "!=",
+             "and", "or", "unary -", "unary !"]
+
+
+def expression(operator, width):
+    if operator.startswith("unary "):
+        return operator[-1] * width + "a"
+    return "a" + (" " + operator + " b") * width
+
+
+def program(operator, width):
+    return ("var a = 3; var b = 2; var x;\n"
+            "for (var i = 0; i < " + str(ITERATIONS) + "; i = i + 1) x = " +
+            expression(operator, width) + ";\n")
+
+
+def run(engine, source):
+    lox = Lox(engine)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        lox.run(source)
+        return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    engine = sys.argv[1] if len(sys.argv) > 1 else "tree"
+    print("%-10s %10s" % ("operator", "ns/op"))
+    for operator in OPERATORS:
+        narrow = min(run(engine, program(operator, 1)) for repeat in range(3))
+        wide = min(run(engine, program(operator, WIDTH + 1)) for repeat in range(3))
+        print("%-10s %10.0f" %
+              (operator, (wide - narrow) / (ITERATIONS * WIDTH) * 1e9))
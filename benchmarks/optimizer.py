@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from lox import Lox
+from regexScanner import RegexScanner
+from parser import Parser
+from optimizer import Optimizer, countNodes
+
+SOURCE = """
+var total = 0;
+var debug = false;
+for (var i = 0; i < 20000; i = i + 1) {
+    total = total + (60 * 60 * 24) / (2 + 2) - ((1 + 1) * (3 - 1));
+    if (false) print "unreachable";
+    if (1 > 2) { print "also unreachable"; } else total = total + (1);
+    while (nil) print "never";
+    if (debug or !(1 == 1)) print total;
+}
+print total;
+"""
+
+
+def run(source, optimize):
+    lox = Lox()
+    lox.optimize = optimize
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        lox.run(source)
+        return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    statements = Parser(RegexScanner(SOURCE, Lox()).scanTokens(), Lox()).parse()
+    before = countNodes(statements)
+    after = countNodes(Optimizer().optimize(statements))
+    print("nodes: %d -> %d (%.0f%% fewer)" %
+          (before, after, 100.0 * (before - after) / before))
+
+    plain = min(run(SOURCE, False) for repeat in range(3))
+    optimized = min(run(SOURCE, True) for repeat in range(3))
+    print("tree engine: %.3fs -> %.3fs with -O" % (plain, optimized))
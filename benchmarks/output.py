@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+LOX = os.path.join(HERE, "..", "lox.py")
+
+# Prints 200000 numbers, a tenth of them repeats, the rest distinct.
+SOURCE = ("var j = 0;\n"
+          "for (var i = 0; i < 200000; i = i + 1) {\n"
+          "  j = j + 1;\n"
+          "  if (j == 10) { j = 0; print 7; } else print i;\n"
+          "}\n")
+
+
+def run(engine, policy, script, target):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, LOX, "--no-cache", "--engine=" + engine,
+                    "--flush=" + policy, script], stdout=target, check=True)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    engines = sys.argv[1:] or ["tree", "closure", "vm", "python"]
+    directory = tempfile.mkdtemp()
+    script = os.path.join(directory, "output.lox")
+    file = open(script, "w")
+    file.write(SOURCE)
+    file.close()
+
+    print("stdout redirected to a file")
+    print("%-8s %12s %12s" % ("engine", "line ms", "block ms"))
+    for engine in engines:
+        times = {}
+        for policy in ("line", "block"):
+            target = open(os.path.join(directory, "out.txt"), "w")
+            times[policy] = min(run(engine, policy, script, target)
+                                for repeat in range(3))
+            target.close()
+        print("%-8s %12.1f %12.1f" % (engine, times["line"] * 1000,
+                                      times["block"] * 1000))
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from regexScanner import RegexScanner
+from parser import Parser, BufferParser
+
+CHUNK = """print 1;
+x = a * (b + 2.5) - c / 4 >= d and !e or f == "s";
+y = -(-x) + f()() * g - h() / 3;
+print a < b == (c <= d) != e > f;
+z = x = y = 1 + 2 + 3 + 4 + 5 + 6 + 7 + 8;
+"""
+
+
+class Sink:
+    def error(self, line, message):
+        raise RuntimeError(message)
+
+    def error2(self, token, message):
+        raise RuntimeError(message)
+
+
+def countCalls(parse):
+    calls = [0]
+
+    def profile(frame, event, argument):
+        if event == "call":
+            calls[0] += 1
+
+    sys.setprofile(profile)
+    parse()
+    sys.setprofile(None)
+    return calls[0]
+
+
+def best(function):
+    elapsed = None
+    for repeat in range(3):
+        start = time.perf_counter()
+        result = function()
+        run = time.perf_counter() - start
+        if elapsed is None or run < elapsed:
+            elapsed = run
+    return result, elapsed
+
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    source = CHUNK * repeats
+    sample = RegexScanner(CHUNK, Sink()).scanTokens()
+    calls = countCalls(lambda: Parser(sample, Sink()).parse())
+    print("%.1f Python calls per token while parsing" % (calls / len(sample)))
+
+    tokens, scanList = best(lambda: RegexScanner(source, Sink()).scanTokens())
+    buffer, scanBuffer = best(lambda: RegexScanner(source, Sink()).scanBuffer())
+    statements, parseList = best(lambda: Parser(tokens, Sink()).parse())
+    statements, parseBuffer = best(lambda: BufferParser(buffer, Sink()).parse())
+
+    print("%d tokens" % len(tokens))
+    print("%-13s %8s %13s %13s" % ("", "parse", "parse tok/s", "scan+parse/s"))
+    for name, scan, parse in (("Parser", scanList, parseList),
+                              ("BufferParser", scanBuffer, parseBuffer)):
+        print("%-13s %7.3fs %13.0f %13.0f" % (name, parse, len(tokens) / parse,
+                                             len(tokens) / (scan + parse)))
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from lox import Lox
+from profiler import Profiler
+
+
+def execute(lox, statements, profiler):
+    with contextlib.redirect_stdout(io.StringIO()):
+        if profiler is not None:
+            profiler.start()
+        start = time.perf_counter()
+        lox.execute(statements)
+        elapsed = time.perf_counter() - start
+        if profiler is not None:
+            profiler.stop()
+    return elapsed
+
+
+if __name__ == "__main__":
+    name = sys.argv[1] if len(sys.argv) > 1 else "fibonacci"
+    file = open(os.path.join(HERE, "lox", name + ".lox"))
+    source = file.read()
+    file.close()
+
+    lox = Lox()
+    statements = lox.compile(source)
+    plain = []
+    profiled = []
+    samples = 0
+    # Interleaved, so that drift in machine speed hits both sides.
+    for repeat in range(10):
+        plain.append(execute(lox, statements, None))
+        profiler = Profiler()
+        profiled.append(execute(lox, statements, profiler))
+        samples += profiler.samples
+
+    before = statistics.median(plain)
+    after = statistics.median(profiled)
+    print("%s: %.3fs plain, %.3fs profiled (%+.1f%%), %d samples per run" %
+          (name, before, after, 100 * (after - before) / before,
+           samples // 10))
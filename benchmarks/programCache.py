@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from lox import Lox
+from programCache import ProgramCache
+
+# A script that does almost no work at run time, so startup dominates.
+CHUNK = """{
+    var a = 1;
+    var b = a * (2 + 3) - 4 / 5;
+    if (a < b and !(b == 3) or a >= 7) { b = b - 1; } else { a = a + 1; }
+    while (a > 100) { a = a - 1; }
+}
+"""
+
+
+def launch(script, arguments, environment):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, os.path.join(ROOT, "lox.py")] +
+                   arguments + [script], env=environment, check=True,
+                   stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    source = CHUNK * repeats + "print \"done\";\n"
+    directory = tempfile.mkdtemp()
+    script = os.path.join(directory, "startup.lox")
+    file = open(script, "w")
+    file.write(source)
+    file.close()
+
+    cache = ProgramCache(os.path.join(directory, "cache"))
+    environment = dict(os.environ, LOX_CACHE_DIR=cache.directory)
+    print("source: %d lines, %.0f KB" %
+          (source.count("\n"), len(source) / 1024))
+
+    lox = Lox()
+    start = time.perf_counter()
+    statements = lox.compile(source)
+    compiled = time.perf_counter() - start
+    key = cache.key(source, False)
+    cache.store(key, statements)
+    start = time.perf_counter()
+    cache.load(key)
+    loaded = time.perf_counter() - start
+    print("in process: compile %.1f ms, cache load %.1f ms (%.1fx)" %
+          (compiled * 1000, loaded * 1000, compiled / loaded))
+
+    uncached = min(launch(script, ["--no-cache"], environment)
+                   for repeat in range(5))
+    cold = []
+    for repeat in range(5):
+        cache.clear()
+        cold.append(launch(script, [], environment))
+    warm = min(launch(script, [], environment) for repeat in range(5))
+    print("lox.py --no-cache %.1f ms, cold %.1f ms, warm %.1f ms" %
+          (uncached * 1000, min(cold) * 1000, warm * 1000))
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from lox import Lox
+from rope import Rope
+
+# Builds a 1 MB string sixteen characters at a time and prints it once.
+PIECES = 65536
+SOURCE = ('var s = "";\n'
+          'for (var i = 0; i < %d; i = i + 1) s = s + "0123456789abcdef";\n'
+          "print s;\n" % PIECES)
+
+
+def run(engine, threshold):
+    lox = Lox(engine)
+    statements = lox.compile(SOURCE)
+    Rope.threshold = threshold
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):
+            start = time.perf_counter()
+            lox.execute(statements)
+            seconds = time.perf_counter() - start
+    finally:
+        Rope.threshold = 256
+    assert len(output.getvalue()) == 16 * PIECES + 1
+    return seconds
+
+
+if __name__ == "__main__":
+    engines = sys.argv[1:] or list(Lox.engines)
+    print("%-8s %12s %12s" % ("engine", "str ms", "rope ms"))
+    for engine in engines:
+        # An infinite threshold keeps every result a plain Python string,
+        # which is how + worked before ropes.
+        plain = min(run(engine, float("inf")) for repeat in range(3))
+        rope = min(run(engine, 256) for repeat in range(3))
+        print("%-8s %12.1f %12.1f" % (engine, plain * 1000, rope * 1000))
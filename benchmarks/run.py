@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from lox import Lox
+
+# The phases of Lox.compile and then execution; "resolve" also runs the
+# purity analysis.
+PHASES = ("scan", "parse", "resolve", "execute")
+
+
+def scannerSource():
+    # Every kind of token the scanner knows, with comments and blank lines,
+    # in top-level statements that are cheap to run.
+    chunk = ('var name_%d = "a string literal" + "more"; // trailing comment\n'
+             "\n"
+             "if (name_%d != nil and 12.5 <= 99 or !false) name_%d = 3;\n")
+    return "".join(chunk % (index, index, index) for index in range(5000))
+
+
+def parserSource():
+    # Long, deeply parenthesized expressions at every precedence level.
+    chunk = ("x = -(a + b * (c - d / (e + 1)) >= f) == !(g < h or i and j)"
+             " != ((((k + 1) * 2) - 3) / 4) > l;\n")
+    names = "abcdefghijkl"
+    declarations = "".join("var %s = %d;\n" % (name, index + 1)
+                           for index, name in enumerate(names))
+    return declarations + "var x;\n" + chunk * 5000
+
+
+def workloads():
+    sources = {}
+    directory = os.path.join(HERE, "lox")
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".lox"):
+            file = open(os.path.join(directory, name))
+            sources[name[:-len(".lox")]] = file.read()
+            file.close()
+    sources["scanner"] = scannerSource()
+    sources["parser"] = parserSource()
+    return sources
+
+
+class Discard:
+    def write(self, text):
+        pass
+
+    def flush(self):
+        pass
+
+
+def runOnce(engine, source):
+    lox = Lox(engine)
+    timings = []
+
+    start = time.perf_counter()
+    tokens = lox.scan(source)
+    timings.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    statements = lox.parse(tokens)
+    timings.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    statements = lox.resolve(statements)
+    timings.append(time.perf_counter() - start)
+
+    if statements is None:
+        raise RuntimeError("benchmark source does not compile")
+
+    stdout = sys.stdout
+    sys.stdout = Discard()
+    try:
+        start = time.perf_counter()
+        lox.execute(statements)
+        timings.append(time.perf_counter() - start)
+    finally:
+        sys.stdout = stdout
+
+    if lox.hadRuntimeError:
+        raise RuntimeError("benchmark raised a runtime error")
+    return timings
+
+
+def summarize(samples):
+    return {"min": min(samples), "median": statistics.median(samples),
+            "mean": statistics.mean(samples),
+            "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0}
+
+
+def run(engine, names, warmup, repeat):
+    sources = workloads()
+    results = {}
+    for name in names or sources:
+        if name not in sources:
+            raise SystemExit("unknown benchmark '" + name + "'")
+        for index in range(warmup):
+            runOnce(engine, sources[name])
+        samples = [runOnce(engine, sources[name]) for index in range(repeat)]
+        results[name] = {phase: summarize([sample[index]
+                                           for sample in samples])
+                         for index, phase in enumerate(PHASES)}
+        print("%-12s %s" % (name, "  ".join(
+            "%s %8.2f ms" % (phase, results[name][phase]["median"] * 1000)
+            for phase in PHASES)), file=sys.stderr)
+
+    return {"engine": engine, "python": platform.python_version(),
+            "machine": platform.machine(), "warmup": warmup,
+            "repeat": repeat, "benchmarks": results}
+
+
+def compare(basePath, newPath, threshold):
+    # Compares medians phase by phase. Phases faster than a millisecond in
+    # the baseline are too noisy to flag.
+    file = open(basePath)
+    base = json.load(file)["benchmarks"]
+    file.close()
+    file = open(newPath)
+    new = json.load(file)["benchmarks"]
+    file.close()
+
+    regressions = 0
+    print("%-12s %-8s %12s %12s %8s" %
+          ("benchmark", "phase", "base ms", "new ms", "change"))
+    for name in base:
+        if name not in new:
+            continue
+        for phase in PHASES:
+            before = base[name][phase]["median"]
+            after = new[name][phase]["median"]
+            change = (after - before) / before if before else 0.0
+            flag = ""
+            if change > threshold and before >= 0.001:
+                flag = "  REGRESSION"
+                regressions += 1
+            print("%-12s %-8s %12.2f %12.2f %+7.1f%%%s" %
+                  (name, phase, before * 1000, after * 1000, change * 100,
+                   flag))
+    return regressions
+
+
+def usage():
+    print("Usage: run.py [--engine=" + "|".join(Lox.engines) + "] "
+          "[--warmup=N] [--repeat=N] [--output=path] [benchmark ...]\n"
+          "       run.py --compare [--threshold=0.05] base.json new.json",
+          file=sys.stderr)
+    sys.exit(64)
+
+
+if __name__ == "__main__":
+    engine = "tree"
+    warmup = 1
+    repeat = 5
+    output = None
+    comparing = False
+    threshold = 0.05
+    args = []
+    for arg in sys.argv[1:]:
+        if arg.startswith("--engine="):
+            engine = arg[len("--engine="):]
+            if engine not in Lox.engines:
+                usage()
+        elif arg.startswith("--warmup="):
+            warmup = int(arg[len("--warmup="):])
+        elif arg.startswith("--repeat="):
+            repeat = int(arg[len("--repeat="):])
+        elif arg.startswith("--output="):
+            output = arg[len("--output="):]
+        elif arg == "--compare":
+            comparing = True
+        elif arg.startswith("--threshold="):
+            threshold = float(arg[len("--threshold="):])
+        elif arg.startswith("-"):
+            usage()
+        else:
+            args.append(arg)
+
+    if comparing:
+        if len(args) != 2:
+            usage()
+        sys.exit(1 if compare(args[0], args[1], threshold) else 0)
+
+    if repeat < 1:
+        usage()
+    results = run(engine, args, warmup, repeat)
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if output is None:
+        print(text)
+    else:
+        file = open(output, "w")
+        file.write(text + "\n")
+        file.close()
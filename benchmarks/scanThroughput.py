@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from scanner import Scanner
+from regexScanner import RegexScanner
+
+CHUNK = """// generated workload
+var total = 0;
+var name = "scanner benchmark";
+for (var i = 0; i < 1000; i = i + 1) {
+    if (i >= 10 and i != 500 or !(i <= 3)) total = total + i * 2.5 / 7;
+    else total = total - 1;
+}
+print name + " done";
+print total == 12.75;
+"""
+
+
+class Sink:
+    def error(self, line, message):
+        raise RuntimeError(message)
+
+
+def measure(scannerClass, source):
+    best = None
+    for repeat in range(3):
+        start = time.perf_counter()
+        tokens = scannerClass(source, Sink()).scanTokens()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return len(tokens), best
+
+
+if __name__ == "__main__":
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    source = CHUNK * int(megabytes * 1024 * 1024 / len(CHUNK))
+    print("source: %.1f MB" % (len(source) / 1024 / 1024))
+    for scannerClass in (Scanner, RegexScanner):
+        count, elapsed = measure(scannerClass, source)
+        print("%-13s %8d tokens %7.3fs %10.0f tokens/s" %
+              (scannerClass.__name__, count, elapsed, count / elapsed))
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+LOX = os.path.join(ROOT, "lox.py")
+
+# Budget for `lox.py empty.lox` on top of a bare `python -c pass`.
+TARGET = 0.020
+
+# Deployed runs import from __pycache__, so measure with bytecode caching
+# on even if the calling environment turns it off.
+ENVIRONMENT = dict(os.environ)
+ENVIRONMENT.pop("PYTHONDONTWRITEBYTECODE", None)
+
+
+def wallTime(command, runs):
+    best = None
+    for run in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, env=ENVIRONMENT, check=True)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def importTimes(command):
+    # -X importtime writes "import time: self | cumulative | name" lines to
+    # stderr; only top-level imports (no leading spaces in the name) are kept.
+    result = subprocess.run([sys.executable, "-X", "importtime"] + command,
+                            env=ENVIRONMENT, stderr=subprocess.PIPE, text=True,
+                            check=True)
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self, cumulative, name = line[len("import time:"):].split("|")
+        if not name[1:].startswith(" "):
+            times.append((int(cumulative), int(self), name.strip()))
+    return sorted(times, reverse=True)
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    empty = os.path.join(tempfile.mkdtemp(), "empty.lox")
+    open(empty, "w").close()
+    wallTime([sys.executable, LOX, empty], 1)
+
+    print("%-24s %10s %10s" % ("top-level import", "self us", "total us"))
+    for cumulative, self, name in importTimes([LOX, empty])[:15]:
+        print("%-24s %10d %10d" % (name, self, cumulative))
+    print()
+
+    python = wallTime([sys.executable, "-c", "pass"], runs)
+    print("python -c pass          %6.1f ms" % (python * 1000))
+    for arguments in ([], ["--no-cache"]):
+        lox = wallTime([sys.executable, LOX] + arguments + [empty], runs)
+        print("lox.py %-10s empty  %6.1f ms  (+%.1f ms, target +%.0f ms)" %
+              (" ".join(arguments), lox * 1000, (lox - python) * 1000,
+               TARGET * 1000))
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def generate(path, statements):
+    file = open(path, "w")
+    file.write("var total = 0;\n")
+    for index in range(statements):
+        file.write("total = total + " + str(index) + ";\n")
+        if index % 1000 == 0:
+            file.write("print total;\n")
+    file.close()
+
+
+def measure(arguments):
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, os.path.join(ROOT, "lox.py")] +
+                               arguments, stdout=subprocess.PIPE)
+    process.stdout.readline()
+    firstOutput = time.perf_counter() - start
+    process.stdout.read()
+    pid, status, usage = os.wait4(process.pid, 0)
+    total = time.perf_counter() - start
+    return firstOutput, total, usage.ru_maxrss / 1024
+
+
+if __name__ == "__main__":
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    path = os.path.join(tempfile.mkdtemp(), "generated.lox")
+    generate(path, statements)
+    print("source: %.1f MB, %d statements" %
+          (os.path.getsize(path) / 1024 / 1024, statements))
+    print("%-8s %12s %8s %10s" % ("mode", "first line", "total", "max RSS"))
+    for mode, arguments in (("batch", [path]), ("stream", ["--stream", path])):
+        firstOutput, total, rss = measure(arguments)
+        print("%-8s %11.3fs %7.2fs %7.1f MB" % (mode, firstOutput, total, rss))
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from lox import Lox
+
+DELAY = 0.5
+
+# Every task sleeps for DELAY and then waits for the task spawned before
+# it, so awaiting the last one waits for them all.
+SOURCE = ("var done = 0;\n"
+          "fun task(previous) {\n"
+          "  fun run() {\n"
+          "    sleep(%s);\n"
+          "    if (previous != nil) await(previous);\n"
+          "    done = done + 1;\n"
+          "  }\n"
+          "  return run;\n"
+          "}\n"
+          "var last = nil;\n"
+          "for (var i = 0; i < %d; i = i + 1) last = spawn(task(last));\n"
+          "await(last);\n"
+          "print done;\n")
+
+
+def run(engine, count):
+    lox = Lox(engine)
+    lox.asyncMode = True
+    statements = lox.compile(SOURCE % (DELAY, count))
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        start = time.perf_counter()
+        lox.execute(statements)
+        seconds = time.perf_counter() - start
+    assert output.getvalue() == "%d\n" % count
+    return seconds
+
+
+if __name__ == "__main__":
+    engines = sys.argv[1:] or ["tree", "closure"]
+    print("each task sleeps %.1f s" % DELAY)
+    print("%-8s %6s %10s %14s" % ("engine", "tasks", "wall s", "sequential s"))
+    for engine in engines:
+        for count in (1000, 5000):
+            seconds = run(engine, count)
+            print("%-8s %6d %10.2f %14.0f" %
+                  (engine, count, seconds, count * DELAY))
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from regexScanner import RegexScanner
+from parser import Parser, BufferParser
+
+CHUNK = """// generated workload
+var total = 0;
+var name = "token buffer benchmark";
+for (var i = 0; i < 1000; i = i + 1) {
+    if (i >= 10 and i != 500 or !(i <= 3)) total = total + i * 2.5 / 7;
+    else { total = total - (1 + 2) * 3; }
+}
+print name + " done";
+print total == 12.75;
+"""
+
+
+class Sink:
+    def error(self, line, message):
+        raise RuntimeError(message)
+
+    def error2(self, token, message):
+        raise RuntimeError(message)
+
+
+def tokenList(source):
+    tokens = RegexScanner(source, Sink()).scanTokens()
+    return tokens, Parser(tokens, Sink()).parse()
+
+
+def tokenBuffer(source):
+    buffer = RegexScanner(source, Sink()).scanBuffer()
+    return buffer, BufferParser(buffer, Sink()).parse()
+
+
+def measure(frontEnd, source):
+    gc.collect()
+    collections = sum(stat["collections"] for stat in gc.get_stats())
+    start = time.perf_counter()
+    result = frontEnd(source)
+    elapsed = time.perf_counter() - start
+    collections = sum(stat["collections"] for stat in gc.get_stats()) - collections
+    del result
+
+    gc.collect()
+    tracemalloc.start()
+    result = frontEnd(source)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, collections, peak
+
+
+if __name__ == "__main__":
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+    source = CHUNK * int(megabytes * 1024 * 1024 / len(CHUNK))
+    print("source: %.1f MB" % (len(source) / 1024 / 1024))
+    print("%-12s %9s %12s %12s" % ("front end", "seconds", "gc passes", "peak"))
+    for name, frontEnd in (("token list", tokenList),
+                           ("token buffer", tokenBuffer)):
+        elapsed, collections, peak = measure(frontEnd, source)
+        print("%-12s %8.2fs %12d %9.1f MB" %
+              (name, elapsed, collections, peak / 1024 / 1024))
@@ -0,0 +1,84 @@
+from array import array
+
+
+class OpCode:
+    CONSTANT = 0
+    NIL = 1
+    TRUE = 2
+    FALSE = 3
+    POP = 4
+    POP_N = 5
+    GET_LOCAL = 6
+    SET_LOCAL = 7
+    GET_GLOBAL = 8
+    DEFINE_GLOBAL = 9
+    SET_GLOBAL = 10
+    EQUAL = 11
+    NOT_EQUAL = 12
+    GREATER = 13
+    GREATER_EQUAL = 14
+    LESS = 15
+    LESS_EQUAL = 16
+    ADD = 17
+    SUBTRACT = 18
+    MULTIPLY = 19
+    DIVIDE = 20
+    NOT = 21
+    NEGATE = 22
+    PRINT = 23
+    JUMP = 24
+    JUMP_IF_FALSE = 25
+    JUMP_IF_TRUE = 26
+    POP_JUMP_IF_FALSE = 27
+    CALL = 28
+    RETURN = 29
+    TAIL_CALL = 30
+    CLOSURE = 31
+    GET_UPVALUE = 32
+    SET_UPVALUE = 33
+    CLOSE_UPVALUE = 34
+
+
+class Chunk:
+    def __init__(self):
+        self.code = array("i")
+        self.constants = []
+        self.tokens = {}
+        self.constantIndex = {}
+
+    def write(self, op, token=None):
+        if token is not None:
+            self.tokens[len(self.code)] = token
+        self.code.append(op)
+        return len(self.code) - 1
+
+    def addConstant(self, value):
+        # Keyed on the float's exact bits so that 0.0 and -0.0 stay distinct.
+        if isinstance(value, float):
+            key = (float, value.hex())
+        else:
+            key = (type(value), value)
+
+        index = self.constantIndex.get(key)
+        if index is None:
+            index = len(self.constants)
+            self.constants.append(value)
+            self.constantIndex[key] = index
+        return index
+
+
+class CompiledFunction:
+    # A function declaration, or the top-level script, compiled to its own
+    # code. Closures made from it at run time share it. The code is kept as
+    # a list so that the VM does not re-box operands on every read.
+    __slots__ = ("name", "arity", "code", "constants", "tokens",
+                 "upvalueCount", "pure")
+
+    def __init__(self, name, arity, chunk, upvalueCount, pure):
+        self.name = name
+        self.arity = arity
+        self.code = list(chunk.code)
+        self.constants = chunk.constants
+        self.tokens = chunk.tokens
+        self.upvalueCount = upvalueCount
+        self.pure = pure
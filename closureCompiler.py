@@ -0,0 +1,447 @@
+from tokenType import TokenType
+from environment import Environment
+from error import LoxRuntimeError, NativeError
+from loxCallable import LoxCallable
+from interpreter import Interpreter
+from loxFunction import LoxFunction, ReturnValue, TailCall
+from stmt import Block
+
+
+class ClosureCompiler:
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+
+    def compileStmt(self, stmt):
+        return stmt.accept(self)
+
+    def compileExpr(self, expr):
+        return expr.accept(self)
+
+    def visitLiteralExpr(self, expr):
+        value = expr.value
+
+        def literal():
+            return value
+        return literal
+
+    def visitGroupingExpr(self, expr):
+        return self.compileExpr(expr.expression)
+
+    def visitUnaryExpr(self, expr):
+        right = self.compileExpr(expr.right)
+        operator = expr.operator
+        interpreter = self.interpreter
+
+        if operator.type == TokenType.MINUS:
+            def negate():
+                value = right()
+                if type(value) is not float:
+                    return interpreter.negate(operator, value)
+                return -value
+            return negate
+        elif operator.type == TokenType.BANG:
+            def bang():
+                value = right()
+                return value is None or value is False
+            return bang
+        else:
+            def unknown():
+                right()
+                return None
+            return unknown
+
+    def visitBinaryExpr(self, expr):
+        left = self.compileExpr(expr.left)
+        right = self.compileExpr(expr.right)
+        operator = expr.operator
+        interpreter = self.interpreter
+        type_ = operator.type
+        handler = interpreter.binaryHandlers.get(type_)
+
+        # Each operator gets its own closure with the number check fused in:
+        # the common float/float case costs two type() calls, anything else
+        # (strings, arrays and the error messages) falls back to the
+        # interpreter's own handler.
+        if type_ == TokenType.PLUS:
+            def add():
+                a = left()
+                b = right()
+                if type(a) is float and type(b) is float:
+                    return a + b
+                return handler(interpreter, operator, a, b)
+            return add
+        elif type_ == TokenType.MINUS:
+            def subtract():
+                a = left()
+                b = right()
+                if type(a) is not float or type(b) is not float:
+                    return handler(interpreter, operator, a, b)
+                return a - b
+            return subtract
+        elif type_ == TokenType.STAR:
+            def multiply():
+                a = left()
+                b = right()
+                if type(a) is not float or type(b) is not float:
+                    return handler(interpreter, operator, a, b)
+                return a * b
+            return multiply
+        elif type_ == TokenType.SLASH:
+            def divide():
+                a = left()
+                b = right()
+                if type(a) is not float or type(b) is not float or b == 0.0:
+                    return handler(interpreter, operator, a, b)
+                return a / b
+            return divide
+        elif type_ == TokenType.GREATER:
+            def greater():
+                a = left()
+                b = right()
+                if type(a) is not float or type(b) is not float:
+                    return handler(interpreter, operator, a, b)
+                return a > b
+            return greater
+        elif type_ == TokenType.GREATER_EQUAL:
+            def greaterEqual():
+                a = left()
+                b = right()
+                if type(a) is not float or type(b) is not float:
+                    return handler(interpreter, operator, a, b)
+                return a >= b
+            return greaterEqual
+        elif type_ == TokenType.LESS:
+            def less():
+                a = left()
+                b = right()
+                if type(a) is not float or type(b) is not float:
+                    return handler(interpreter, operator, a, b)
+                return a < b
+            return less
+        elif type_ == TokenType.LESS_EQUAL:
+            def lessEqual():
+                a = left()
+                b = right()
+                if type(a) is not float or type(b) is not float:
+                    return handler(interpreter, operator, a, b)
+                return a <= b
+            return lessEqual
+        elif type_ == TokenType.BANG_EQUAL:
+            isEqual = interpreter.isEqual
+
+            def notEqual():
+                return not isEqual(left(), right())
+            return notEqual
+        elif type_ == TokenType.EQUAL_EQUAL:
+            isEqual = interpreter.isEqual
+
+            def equal():
+                return isEqual(left(), right())
+            return equal
+        else:
+            def unknown():
+                left()
+                right()
+                return None
+            return unknown
+
+    def visitLogicalExpr(self, expr):
+        left = self.compileExpr(expr.left)
+        right = self.compileExpr(expr.right)
+
+        if expr.operator.type == TokenType.OR:
+            def logicalOr():
+                value = left()
+                if value is None or value is False:
+                    return right()
+                return value
+            return logicalOr
+        else:
+            def logicalAnd():
+                value = left()
+                if value is None or value is False:
+                    return value
+                return right()
+            return logicalAnd
+
+    def visitVariableExpr(self, expr):
+        interpreter = self.interpreter
+        slot = expr.slot
+        depth = expr.depth
+
+        if slot is None:
+            name = expr.name
+            lexeme = name.lexeme
+            values = interpreter.globals.values
+
+            def globalVariable():
+                try:
+                    return values[lexeme]
+                except KeyError:
+                    raise LoxRuntimeError(
+                        name, "Undefined variable '" + lexeme + "'.")
+            return globalVariable
+        elif depth == 0:
+            def localVariable():
+                return interpreter.environment.values[slot]
+            return localVariable
+        elif depth == 1:
+            def enclosingVariable():
+                return interpreter.environment.enclosing.values[slot]
+            return enclosingVariable
+        else:
+            def ancestorVariable():
+                return interpreter.environment.ancestor(depth).values[slot]
+            return ancestorVariable
+
+    def visitAssignExpr(self, expr):
+        interpreter = self.interpreter
+        value = self.compileExpr(expr.value)
+        slot = expr.slot
+        depth = expr.depth
+
+        if slot is None:
+            name = expr.name
+            lexeme = name.lexeme
+            values = interpreter.globals.values
+
+            def assignGlobal():
+                result = value()
+                if lexeme not in values:
+                    raise LoxRuntimeError(
+                        name, "Undefined variable '" + lexeme + "'.")
+                values[lexeme] = result
+                return result
+            return assignGlobal
+        elif depth == 0:
+            def assignLocal():
+                result = value()
+                interpreter.environment.values[slot] = result
+                return result
+            return assignLocal
+        else:
+            def assignAncestor():
+                result = value()
+                interpreter.environment.ancestor(depth).values[slot] = result
+                return result
+            return assignAncestor
+
+    def visitCallExpr(self, expr):
+        callee = self.compileExpr(expr.callee)
+        arguments = [self.compileExpr(argument) for argument in expr.arguments]
+        paren = expr.paren
+        interpreter = self.interpreter
+        callFunction = interpreter.callFunction
+
+        # Lox functions take the same fast path as in
+        # Interpreter.visitCallExpr: a tail call is raised to the caller's
+        # callFunction loop instead of nesting.
+        if expr.tail:
+            def tailCall():
+                function = callee()
+                values = [argument() for argument in arguments]
+                if type(function) is LoxFunction:
+                    if len(values) != len(function.declaration.params):
+                        interpreter.arityError(paren, function.arity(), values)
+                    raise TailCall(function, values)
+                return callOther(function, values)
+            call = tailCall
+        else:
+            def call():
+                function = callee()
+                values = [argument() for argument in arguments]
+                if type(function) is LoxFunction:
+                    if len(values) != len(function.declaration.params):
+                        interpreter.arityError(paren, function.arity(), values)
+                    return callFunction(function, values)
+                return callOther(function, values)
+
+        def callOther(function, values):
+            if not isinstance(function, LoxCallable):
+                raise LoxRuntimeError(
+                    paren, "Can only call functions and classes.")
+            if len(values) != function.arity():
+                interpreter.arityError(paren, function.arity(), values)
+            try:
+                return function.call(interpreter, values)
+            except NativeError as error:
+                raise LoxRuntimeError(paren, error.message)
+        return call
+
+    def visitFunctionStmt(self, stmt):
+        # The body is compiled once, with the declaration; each call runs it
+        # through ClosureInterpreter.executeBody. Making the function value
+        # is left to Interpreter.visitFunctionStmt, which also memoizes it.
+        interpreter = self.interpreter
+        interpreter.bodies[stmt] = [self.compileStmt(statement)
+                                    for statement in stmt.body]
+
+        def function():
+            interpreter.visitFunctionStmt(stmt)
+        return function
+
+    def visitReturnStmt(self, stmt):
+        if stmt.value is None:
+            def returnNil():
+                raise ReturnValue(None)
+            return returnNil
+
+        value = self.compileExpr(stmt.value)
+
+        def returnStmt():
+            raise ReturnValue(value())
+        return returnStmt
+
+    def visitExpressionStmt(self, stmt):
+        expression = self.compileExpr(stmt.expression)
+
+        def expressionStmt():
+            expression()
+        return expressionStmt
+
+    def visitPrintStmt(self, stmt):
+        expression = self.compileExpr(stmt.expression)
+        stringify = self.interpreter.stringify
+        write = self.interpreter.output.write
+
+        def printStmt():
+            write(stringify(expression()))
+        return printStmt
+
+    def visitVarStmt(self, stmt):
+        interpreter = self.interpreter
+        if stmt.initializer is not None:
+            initializer = self.compileExpr(stmt.initializer)
+        else:
+            def initializer():
+                return None
+        slot = stmt.slot
+
+        if slot is None:
+            lexeme = stmt.name.lexeme
+            values = interpreter.globals.values
+
+            def defineGlobal():
+                values[lexeme] = initializer()
+            return defineGlobal
+        else:
+            def defineLocal():
+                interpreter.environment.values[slot] = initializer()
+            return defineLocal
+
+    def visitBlockStmt(self, stmt):
+        interpreter = self.interpreter
+        statements = [self.compileStmt(statement)
+                      for statement in stmt.statements]
+        size = stmt.size
+
+        if size == 0:
+            def block():
+                for statement in statements:
+                    statement()
+            return block
+
+        def scopedBlock():
+            previous = interpreter.environment
+            interpreter.environment = Environment(previous, size)
+            try:
+                for statement in statements:
+                    statement()
+            finally:
+                interpreter.environment = previous
+        return scopedBlock
+
+    def visitIfStmt(self, stmt):
+        condition = self.compileExpr(stmt.condition)
+        thenBranch = self.compileStmt(stmt.thenBranch)
+
+        if stmt.elseBranch is None:
+            def ifStmt():
+                value = condition()
+                if value is not None and value is not False:
+                    thenBranch()
+            return ifStmt
+
+        elseBranch = self.compileStmt(stmt.elseBranch)
+
+        def ifElseStmt():
+            value = condition()
+            if value is not None and value is not False:
+                thenBranch()
+            else:
+                elseBranch()
+        return ifElseStmt
+
+    def visitWhileStmt(self, stmt):
+        condition = self.compileExpr(stmt.condition)
+        body = self.compileStmt(stmt.body)
+
+        def whileStmt():
+            value = condition()
+            while value is not None and value is not False:
+                body()
+                value = condition()
+        return whileStmt
+
+    def visitForStmt(self, stmt):
+        # Same environments as Interpreter.visitForStmt.
+        interpreter = self.interpreter
+        initializer = (None if stmt.initializer is None
+                       else self.compileStmt(stmt.initializer))
+        condition = self.compileExpr(stmt.condition)
+        increment = (None if stmt.increment is None
+                     else self.compileStmt(stmt.increment))
+        size = stmt.size
+        bodySize = 0
+        if type(stmt.body) is Block and not stmt.fresh:
+            statements = [self.compileStmt(statement)
+                          for statement in stmt.body.statements]
+            bodySize = stmt.body.size
+        else:
+            statements = [self.compileStmt(stmt.body)]
+
+        def forStmt():
+            previous = interpreter.environment
+            if size != 0:
+                interpreter.environment = Environment(previous, size)
+            try:
+                if initializer is not None:
+                    initializer()
+                loop = interpreter.environment
+                scope = loop if bodySize == 0 else Environment(loop, bodySize)
+                value = condition()
+                while value is not None and value is not False:
+                    interpreter.environment = scope
+                    for statement in statements:
+                        statement()
+                    interpreter.environment = loop
+                    if increment is not None:
+                        increment()
+                    value = condition()
+            finally:
+                interpreter.environment = previous
+        return forStmt
+
+
+class ClosureInterpreter(Interpreter):
+    def __init__(self, lox):
+        super().__init__(lox)
+        # The compiled statements of each function body, by declaration.
+        self.bodies = {}
+        self.compiler = ClosureCompiler(self)
+
+    def executeBody(self, declaration):
+        for statement in self.bodies[declaration]:
+            statement()
+
+    def interpret(self, statements):
+        try:
+            compiled = [self.compiler.compileStmt(statement)
+                        for statement in statements]
+            for statement in compiled:
+                statement()
+        except LoxRuntimeError as error:
+            self.output.flush()
+            self.lox.runtimeError(error)
+        finally:
+            self.output.flush()
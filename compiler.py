@@ -0,0 +1,286 @@
+from tokenType import TokenType
+from expr import Call
+from bytecode import Chunk, OpCode, CompiledFunction
+
+
+class Compiler:
+    binaryOps = {
+        TokenType.PLUS: OpCode.ADD,
+        TokenType.MINUS: OpCode.SUBTRACT,
+        TokenType.STAR: OpCode.MULTIPLY,
+        TokenType.SLASH: OpCode.DIVIDE,
+        TokenType.GREATER: OpCode.GREATER,
+        TokenType.GREATER_EQUAL: OpCode.GREATER_EQUAL,
+        TokenType.LESS: OpCode.LESS,
+        TokenType.LESS_EQUAL: OpCode.LESS_EQUAL,
+        TokenType.EQUAL_EQUAL: OpCode.EQUAL,
+        TokenType.BANG_EQUAL: OpCode.NOT_EQUAL,
+    }
+
+    # One Compiler compiles the top-level script and one more each function
+    # declaration, into its own chunk. A local is [name, depth, captured]
+    # and its index in locals is its stack slot in the function's frame; an
+    # upvalue is (isLocal, index), naming a local of the enclosing function
+    # or one of its upvalues.
+    def __init__(self, lox, enclosing=None, declaration=None):
+        self.lox = lox
+        self.enclosing = enclosing
+        self.declaration = declaration
+        self.chunk = Chunk()
+        self.locals = []
+        self.upvalues = []
+        self.scopeDepth = 0
+        if declaration is not None:
+            self.scopeDepth = 1
+            for param in declaration.params:
+                self.locals.append([param.lexeme, 1, False])
+
+    def compile(self, statements):
+        for statement in statements:
+            self.compileStmt(statement)
+        self.emit(OpCode.NIL)
+        self.emit(OpCode.RETURN)
+
+        declaration = self.declaration
+        if declaration is None:
+            return CompiledFunction(None, 0, self.chunk, 0, False)
+        return CompiledFunction(declaration.name, len(declaration.params),
+                                self.chunk, len(self.upvalues),
+                                declaration.pure)
+
+    def compileStmt(self, stmt):
+        stmt.accept(self)
+
+    def compileExpr(self, expr):
+        expr.accept(self)
+
+    def emit(self, op, operand=None, token=None):
+        offset = self.chunk.write(op, token)
+        if operand is not None:
+            self.chunk.write(operand)
+        return offset
+
+    def emitJump(self, op):
+        self.emit(op, 0)
+        return len(self.chunk.code) - 1
+
+    def patchJump(self, offset):
+        self.chunk.code[offset] = len(self.chunk.code)
+
+    def emitConstant(self, value, op=OpCode.CONSTANT, token=None):
+        self.emit(op, self.chunk.addConstant(value), token)
+
+    def beginScope(self):
+        self.scopeDepth += 1
+
+    def endScope(self):
+        self.scopeDepth -= 1
+
+        # Captured locals are moved off the stack into their upvalue, so
+        # that each closure keeps the variable it saw; the rest are popped
+        # together.
+        count = 0
+        while len(self.locals) > 0 and self.locals[-1][1] > self.scopeDepth:
+            if self.locals.pop()[2]:
+                self.emitPops(count)
+                count = 0
+                self.emit(OpCode.CLOSE_UPVALUE)
+            else:
+                count += 1
+        self.emitPops(count)
+
+    def emitPops(self, count):
+        if count == 1:
+            self.emit(OpCode.POP)
+        elif count > 1:
+            self.emit(OpCode.POP_N, count)
+
+    def resolveLocal(self, name):
+        for slot in range(len(self.locals) - 1, -1, -1):
+            if self.locals[slot][0] == name.lexeme:
+                return slot
+        return None
+
+    def resolveUpvalue(self, name):
+        if self.enclosing is None:
+            return None
+
+        slot = self.enclosing.resolveLocal(name)
+        if slot is not None:
+            self.enclosing.locals[slot][2] = True
+            return self.addUpvalue(True, slot)
+
+        index = self.enclosing.resolveUpvalue(name)
+        if index is not None:
+            return self.addUpvalue(False, index)
+        return None
+
+    def addUpvalue(self, isLocal, index):
+        upvalue = (isLocal, index)
+        if upvalue in self.upvalues:
+            return self.upvalues.index(upvalue)
+        self.upvalues.append(upvalue)
+        return len(self.upvalues) - 1
+
+    def visitExpressionStmt(self, stmt):
+        self.compileExpr(stmt.expression)
+        self.emit(OpCode.POP)
+
+    def visitPrintStmt(self, stmt):
+        self.compileExpr(stmt.expression)
+        self.emit(OpCode.PRINT)
+
+    def visitVarStmt(self, stmt):
+        if stmt.initializer is not None:
+            self.compileExpr(stmt.initializer)
+        else:
+            self.emit(OpCode.NIL)
+
+        if self.scopeDepth > 0:
+            self.locals.append([stmt.name.lexeme, self.scopeDepth, False])
+        else:
+            self.emitConstant(stmt.name.lexeme, OpCode.DEFINE_GLOBAL)
+
+    def visitBlockStmt(self, stmt):
+        self.beginScope()
+        for statement in stmt.statements:
+            self.compileStmt(statement)
+        self.endScope()
+
+    def visitIfStmt(self, stmt):
+        self.compileExpr(stmt.condition)
+        elseJump = self.emitJump(OpCode.POP_JUMP_IF_FALSE)
+        self.compileStmt(stmt.thenBranch)
+
+        if stmt.elseBranch is None:
+            self.patchJump(elseJump)
+            return
+
+        endJump = self.emitJump(OpCode.JUMP)
+        self.patchJump(elseJump)
+        self.compileStmt(stmt.elseBranch)
+        self.patchJump(endJump)
+
+    def visitWhileStmt(self, stmt):
+        loopStart = len(self.chunk.code)
+        self.compileExpr(stmt.condition)
+        exitJump = self.emitJump(OpCode.POP_JUMP_IF_FALSE)
+        self.compileStmt(stmt.body)
+        self.emit(OpCode.JUMP, loopStart)
+        self.patchJump(exitJump)
+
+    def visitForStmt(self, stmt):
+        self.beginScope()
+        if stmt.initializer is not None:
+            self.compileStmt(stmt.initializer)
+
+        loopStart = len(self.chunk.code)
+        self.compileExpr(stmt.condition)
+        exitJump = self.emitJump(OpCode.POP_JUMP_IF_FALSE)
+        self.compileStmt(stmt.body)
+        if stmt.increment is not None:
+            self.compileStmt(stmt.increment)
+        self.emit(OpCode.JUMP, loopStart)
+        self.patchJump(exitJump)
+        self.endScope()
+
+    def visitLiteralExpr(self, expr):
+        if expr.value is None:
+            self.emit(OpCode.NIL)
+        elif expr.value is True:
+            self.emit(OpCode.TRUE)
+        elif expr.value is False:
+            self.emit(OpCode.FALSE)
+        else:
+            self.emitConstant(expr.value)
+
+    def visitGroupingExpr(self, expr):
+        self.compileExpr(expr.expression)
+
+    def visitUnaryExpr(self, expr):
+        self.compileExpr(expr.right)
+
+        if expr.operator.type == TokenType.MINUS:
+            self.emit(OpCode.NEGATE, token=expr.operator)
+        elif expr.operator.type == TokenType.BANG:
+            self.emit(OpCode.NOT)
+
+    def visitBinaryExpr(self, expr):
+        self.compileExpr(expr.left)
+        self.compileExpr(expr.right)
+        self.emit(self.binaryOps[expr.operator.type], token=expr.operator)
+
+    def visitLogicalExpr(self, expr):
+        self.compileExpr(expr.left)
+
+        if expr.operator.type == TokenType.OR:
+            endJump = self.emitJump(OpCode.JUMP_IF_TRUE)
+        else:
+            endJump = self.emitJump(OpCode.JUMP_IF_FALSE)
+
+        self.emit(OpCode.POP)
+        self.compileExpr(expr.right)
+        self.patchJump(endJump)
+
+    def visitVariableExpr(self, expr):
+        slot = self.resolveLocal(expr.name)
+        if slot is not None:
+            self.emit(OpCode.GET_LOCAL, slot)
+            return
+
+        index = self.resolveUpvalue(expr.name)
+        if index is not None:
+            self.emit(OpCode.GET_UPVALUE, index)
+        else:
+            self.emitConstant(expr.name.lexeme, OpCode.GET_GLOBAL, expr.name)
+
+    def visitAssignExpr(self, expr):
+        self.compileExpr(expr.value)
+
+        slot = self.resolveLocal(expr.name)
+        if slot is not None:
+            self.emit(OpCode.SET_LOCAL, slot)
+            return
+
+        index = self.resolveUpvalue(expr.name)
+        if index is not None:
+            self.emit(OpCode.SET_UPVALUE, index)
+        else:
+            self.emitConstant(expr.name.lexeme, OpCode.SET_GLOBAL, expr.name)
+
+    def visitFunctionStmt(self, stmt):
+        # A local function is declared before its body is compiled, so that
+        # the body can refer to it. CLOSURE is followed by an (isLocal,
+        # index) pair per upvalue, telling the VM what to capture.
+        if self.scopeDepth > 0:
+            self.locals.append([stmt.name.lexeme, self.scopeDepth, False])
+
+        compiler = Compiler(self.lox, self, stmt)
+        function = compiler.compile(stmt.body)
+        self.emitConstant(function, OpCode.CLOSURE)
+        for isLocal, index in compiler.upvalues:
+            self.chunk.write(1 if isLocal else 0)
+            self.chunk.write(index)
+
+        if self.scopeDepth == 0:
+            self.emitConstant(stmt.name.lexeme, OpCode.DEFINE_GLOBAL)
+
+    def visitReturnStmt(self, stmt):
+        # A call in tail position reuses the returning function's frame.
+        value = stmt.value
+        if value is None:
+            self.emit(OpCode.NIL)
+        elif type(value) is Call and value.tail:
+            self.compileCall(value, OpCode.TAIL_CALL)
+        else:
+            self.compileExpr(value)
+        self.emit(OpCode.RETURN)
+
+    def visitCallExpr(self, expr):
+        self.compileCall(expr, OpCode.CALL)
+
+    def compileCall(self, expr, op):
+        self.compileExpr(expr.callee)
+        for argument in expr.arguments:
+            self.compileExpr(argument)
+        self.emit(op, len(expr.arguments), expr.paren)
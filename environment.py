@@ -2,18 +2,34 @@ from error import LoxRuntimeError
 
 
 class Environment():
-    def __init__(self, enclosing=None):
-        self.values = {}
+    def __init__(self, enclosing=None, size=0):
+        self.values = [None] * size
         self.enclosing = enclosing
 
+    def ancestor(self, depth):
+        environment = self
+        while depth:
+            environment = environment.enclosing
+            depth -= 1
+        return environment
+
+    def getAt(self, depth, slot):
+        return self.ancestor(depth).values[slot]
+
+    def assignAt(self, depth, slot, value):
+        self.ancestor(depth).values[slot] = value
+
+
+class GlobalEnvironment():
+    def __init__(self):
+        self.values = {}
+
     def define(self, name, value):
         self.values[name] = value
 
     def get(self, name):
         if name.lexeme in self.values:
             return self.values[name.lexeme]
-        elif self.enclosing is not None:
-            return self.enclosing.get(name)
         else:
             raise LoxRuntimeError(
                 name, "Undefined variable '" + name.lexeme + "'.")
@@ -21,10 +37,6 @@ class Environment():
     def assign(self, name, value):
         if name.lexeme in self.values:
             self.values[name.lexeme] = value
-            return
-        elif self.enclosing is not None:
-            self.enclosing.assign(name, value)
-            return
         else:
             raise LoxRuntimeError(
                 name, "Undefined variable '" + name.lexeme + "'.")
@@ -12,3 +12,12 @@ class LoxRuntimeError(Exception):
         self.token = token
         self.message = message
         super().__init__(self.message)
+
+
+class NativeError(Exception):
+    # Raised by natives and array operations, which have no token of their
+    # own; the interpreter reports it as a LoxRuntimeError at the call or
+    # operator.
+    def __init__(self, message):
+        self.message = message
+        super().__init__(self.message)
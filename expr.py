@@ -1,20 +1,49 @@
+class Expr:
+    __slots__ = ()
 
 
-class Expr:
-    pass
+class Assign(Expr):
+    __slots__ = ("name", "value", "depth", "slot")
+
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+        self.depth = None
+        self.slot = None
+
+    def accept(self, visitor):
+        return visitor.visitAssignExpr(self)
 
 
 class Binary(Expr):
+    __slots__ = ("left", "operator", "right", "handler")
+
     def __init__(self, left, operator, right):
         self.left = left
         self.operator = operator
         self.right = right
+        self.handler = None
 
     def accept(self, visitor):
         return visitor.visitBinaryExpr(self)
 
 
+class Call(Expr):
+    __slots__ = ("callee", "paren", "arguments", "tail")
+
+    def __init__(self, callee, paren, arguments):
+        self.callee = callee
+        self.paren = paren
+        self.arguments = arguments
+        self.tail = False
+
+    def accept(self, visitor):
+        return visitor.visitCallExpr(self)
+
+
 class Grouping(Expr):
+    __slots__ = ("expression",)
+
     def __init__(self, expression):
         self.expression = expression
 
@@ -23,6 +52,8 @@ class Grouping(Expr):
 
 
 class Literal(Expr):
+    __slots__ = ("value",)
+
     def __init__(self, value):
         self.value = value
 
@@ -30,53 +61,38 @@ class Literal(Expr):
         return visitor.visitLiteralExpr(self)
 
 
-class Unary(Expr):
-    def __init__(self, operator, right):
-        self.operator = operator
-        self.right = right
-
-    def accept(self, visitor):
-        return visitor.visitUnaryExpr(self)
-
-
-class Variable(Expr):
-    def __init__(self, name):
-        self.name = name
-
-    def accept(self, visitor):
-        return visitor.visitVariableExpr(self)
-
-
-class Assign(Expr):
-    def __init__(self, name, value):
-        self.name = name
-        self.value = value
-
-    def accept(self, visitor):
-        return visitor.visitAssignExpr(self)
-
-
 class Logical(Expr):
+    __slots__ = ("left", "operator", "right", "handler")
+
     def __init__(self, left, operator, right):
         self.left = left
         self.operator = operator
         self.right = right
+        self.handler = None
 
     def accept(self, visitor):
         return visitor.visitLogicalExpr(self)
 
-class Call(Expr):
-    def __init__(self, callee, paren, arguments):
-        self.callee = callee
-        self.paren = paren
-        self.arguments = arguments
-
-    def accept(self, visitor):
-        return visitor.visitCallExpr(self)
 
+class Unary(Expr):
+    __slots__ = ("operator", "right", "handler")
 
+    def __init__(self, operator, right):
+        self.operator = operator
+        self.right = right
+        self.handler = None
 
+    def accept(self, visitor):
+        return visitor.visitUnaryExpr(self)
 
 
+class Variable(Expr):
+    __slots__ = ("name", "depth", "slot")
 
+    def __init__(self, name):
+        self.name = name
+        self.depth = None
+        self.slot = None
 
+    def accept(self, visitor):
+        return visitor.visitVariableExpr(self)
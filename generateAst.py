@@ -5,34 +5,60 @@ import sys
 
 class GenerateAst:
     def defineAst(outputDir, baseName, types):
-        path = outputDir + "/" + baseName + ".py"
+        path = outputDir + "/" + baseName.lower() + ".py"
         file = open(path, "w")
-        file.write("\n\nclass " + baseName + ":\n    pass\n\n")
+        file.write("class " + baseName + ":\n    __slots__ = ()\n")
         for type in types:
-            className = type.split(":")[0][:-1]
-            fields = type.split(":")[1]
+            className = type.split(":")[0].strip()
+            fields = type.split(":")[1].strip()
             GenerateAst.defineType(file, baseName, className, fields)
         file.close()
 
     def defineType(file, baseName, className, fieldList):
-        fields = fieldList.split(",")
-        file.write("class " + className + "(" + baseName + "):\n")
-        file.write("    def __init__(self, " + fieldList + " ):\n")
+        # A field written as "name=default" is not a constructor argument;
+        # it is filled in by a later pass such as the Resolver.
+        fields = [field.strip() for field in fieldList.split(",")]
+        arguments = [field for field in fields if "=" not in field]
+        names = [field.split("=")[0] for field in fields]
+
+        file.write("\n\nclass " + className + "(" + baseName + "):\n")
+        slots = ", ".join("\"" + name + "\"" for name in names)
+        if len(names) == 1:
+            slots += ","
+        file.write("    __slots__ = (" + slots + ")\n\n")
+        file.write("    def __init__(self, " + ", ".join(arguments) + "):\n")
         for field in fields:
-            file.write("        self." + field + " = " + field + "\n")
-        file.write("    def accept(self, visitor):\n")
+            if "=" in field:
+                name, default = field.split("=")
+                file.write("        self." + name + " = " + default + "\n")
+            else:
+                file.write("        self." + field + " = " + field + "\n")
+        file.write("\n    def accept(self, visitor):\n")
         file.write("        return visitor.visit" +
-                   className + baseName + "(self)\n\n")
+                   className + baseName + "(self)\n")
 
 
 if __name__ == "__main__":
     if len(sys.argv) != 2:
         print("Usage: generate_ast <output directory>", file=sys.stderr)
         sys.exit(64)
-        f1()
     outputDir = sys.argv[1]
     GenerateAst.defineAst(outputDir, "Expr", [
-        "Binary : left, operator, right",
+        "Assign : name, value, depth=None, slot=None",
+        "Binary : left, operator, right, handler=None",
+        "Call : callee, paren, arguments, tail=False",
         "Grouping : expression",
         "Literal : value",
-        "Unary : operator, right"])
+        "Logical : left, operator, right, handler=None",
+        "Unary : operator, right, handler=None",
+        "Variable : name, depth=None, slot=None"])
+    GenerateAst.defineAst(outputDir, "Stmt", [
+        "Block : statements, size=0, line=0",
+        "Expression : expression, line=0",
+        "For : initializer, condition, increment, body, size=0, fresh=False, line=0",
+        "Function : name, params, body, slot=None, size=0, pure=False, line=0",
+        "If : condition, thenBranch, elseBranch, line=0",
+        "Print : expression, line=0",
+        "Return : keyword, value, line=0",
+        "Var : name, initializer, slot=None, line=0",
+        "While : condition, body, line=0"])
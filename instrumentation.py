@@ -0,0 +1,157 @@
+from tokenType import TokenType
+from expr import Expr, Logical
+from stmt import Stmt, If, While, For
+from environment import Environment
+from interpreter import Interpreter
+
+
+class Counters:
+    # Exact per-node evaluation counts and per-branch counts, collected by
+    # InstrumentedInterpreter. Nodes hash by identity, so the node itself is
+    # the key. A branch is [taken, not taken]: for If the then and else
+    # arms, for While and For entering the body and leaving the loop, for and/or
+    # evaluating the right operand and short-circuiting past it.
+    def __init__(self):
+        self.counts = {}
+        self.branches = {}
+        self.statements = []
+
+    def branch(self, node):
+        branch = self.branches.get(node)
+        if branch is None:
+            branch = self.branches[node] = [0, 0]
+        return branch
+
+    def lines(self):
+        # Maps every line a statement starts on to the highest count of the
+        # statements starting there (0 if none ran), and every line with a
+        # branch to that line's branches in source order.
+        lines = {}
+        branches = {}
+        pending = list(reversed(self.statements))
+        while pending:
+            node = pending.pop()
+            if isinstance(node, list):
+                pending.extend(reversed(node))
+                continue
+            if isinstance(node, Stmt):
+                lines[node.line] = max(lines.get(node.line, 0),
+                                       self.counts.get(node, 0))
+            if isinstance(node, (If, While, For, Logical)):
+                line = (node.operator.line if isinstance(node, Logical)
+                        else node.line)
+                branches.setdefault(line, []).append(
+                    self.branches.get(node, [0, 0]))
+
+            if isinstance(node, (Stmt, Expr)):
+                pending.extend(reversed([getattr(node, name)
+                                         for name in node.__slots__]))
+        return lines, branches
+
+    def writeReport(self, path, source):
+        # gcov-style listing: execution count, line number, source. "#####"
+        # marks a statement that never ran and "-" a line with none.
+        lines, branches = self.lines()
+        file = open(path, "w")
+        for number, text in enumerate(source.split("\n"), 1):
+            if number in lines:
+                count = lines[number]
+                column = str(count) if count else "#####"
+            else:
+                column = "-"
+            file.write("%9s:%5d:%s\n" % (column, number, text))
+            for index, (taken, notTaken) in enumerate(branches.get(number,
+                                                                  [])):
+                file.write("branch %2d taken %d, not taken %d\n" %
+                           (index, taken, notTaken))
+        file.close()
+
+    def summary(self):
+        lines, branches = self.lines()
+        covered = sum(1 for count in lines.values() if count)
+        arms = [arm for line in branches.values() for branch in line
+                for arm in branch]
+        taken = sum(1 for arm in arms if arm)
+        return ("lines executed: %d of %d, branches taken: %d of %d" %
+                (covered, len(lines), taken, len(arms)))
+
+
+class InstrumentedInterpreter(Interpreter):
+    # Counting lives in this subclass, so the plain Interpreter's execute and
+    # evaluate stay untouched and pay nothing when instrumentation is off.
+    def __init__(self, lox, counters):
+        super().__init__(lox)
+        self.counters = counters
+        self.counts = counters.counts
+
+    def interpret(self, statements):
+        self.counters.statements.extend(statements)
+        super().interpret(statements)
+
+    def execute(self, stmt):
+        counts = self.counts
+        counts[stmt] = counts.get(stmt, 0) + 1
+        stmt.accept(self)
+
+    def evaluate(self, expr):
+        counts = self.counts
+        counts[expr] = counts.get(expr, 0) + 1
+        return expr.accept(self)
+
+    def visitIfStmt(self, stmt):
+        branch = self.counters.branch(stmt)
+        if self.isTruthy(self.evaluate(stmt.condition)):
+            branch[0] += 1
+            self.execute(stmt.thenBranch)
+        else:
+            branch[1] += 1
+            if stmt.elseBranch is not None:
+                self.execute(stmt.elseBranch)
+
+        return None
+
+    def visitWhileStmt(self, stmt):
+        branch = self.counters.branch(stmt)
+        while self.isTruthy(self.evaluate(stmt.condition)):
+            branch[0] += 1
+            self.execute(stmt.body)
+        branch[1] += 1
+
+        return None
+
+    def visitForStmt(self, stmt):
+        # The body runs through execute() so that its block is counted too.
+        branch = self.counters.branch(stmt)
+        previous = self.environment
+        if stmt.size != 0:
+            self.environment = Environment(previous, stmt.size)
+
+        try:
+            if stmt.initializer is not None:
+                self.execute(stmt.initializer)
+            while self.isTruthy(self.evaluate(stmt.condition)):
+                branch[0] += 1
+                self.execute(stmt.body)
+                if stmt.increment is not None:
+                    self.execute(stmt.increment)
+            branch[1] += 1
+
+        finally:
+            self.environment = previous
+
+        return None
+
+    def visitLogicalExpr(self, expr):
+        branch = self.counters.branch(expr)
+        left = self.evaluate(expr.left)
+
+        if expr.operator.type == TokenType.OR:
+            shortCircuit = self.isTruthy(left)
+        else:
+            shortCircuit = not self.isTruthy(left)
+
+        if shortCircuit:
+            branch[1] += 1
+            return left
+        branch[0] += 1
+        return self.evaluate(expr.right)
@@ -1,13 +1,28 @@
+import sys
+
 from tokenType import TokenType
-from environment import Environment
-from error import LoxRuntimeError
+from environment import Environment, GlobalEnvironment
+from error import LoxRuntimeError, NativeError
 from loxCallable import LoxCallable
+from loxFunction import LoxFunction, Memo, ReturnValue, TailCall, memoKey
+from natives import defineNatives
+from loxArray import LoxArray
+from rope import concat, strings
+from output import Output, formatNumber
+from stmt import Block
 
 
 class Interpreter():
     def __init__(self, lox):
         self.lox = lox
-        self.environment = Environment()
+        self.globals = GlobalEnvironment()
+        self.environment = self.globals
+        self.memos = lox.memos
+        self.memoSize = lox.memoSize
+        self.output = Output(sys.stdout, lox.lineBuffered)
+        # Set while a Scheduler runs this interpreter's tasks (--async).
+        self.scheduler = None
+        defineNatives(self.globals)
 
     def visitLiteralExpr(self, expr):
         return expr.value
@@ -21,54 +36,151 @@ class Interpreter():
     def visitUnaryExpr(self, expr):
         right = self.evaluate(expr.right)
 
-        if expr.operator.type == TokenType.MINUS:
-            self.checkNumberOperand(expr.operator, right)
-            return -right
-        elif expr.operator.type == TokenType.BANG:
-            return not self.isTruthy(right)
-        else:
-            return None
+        handler = expr.handler
+        if handler is None:
+            handler = expr.handler = self.unaryHandlers[expr.operator.type]
+        return handler(self, expr.operator, right)
 
     def visitBinaryExpr(self, expr):
         left = self.evaluate(expr.left)
         right = self.evaluate(expr.right)
 
-        if expr.operator.type == TokenType.MINUS:
-            self.checkNumberOperands(expr.operator, left, right)
-            return left - right
-        elif expr.operator.type == TokenType.SLASH:
-            self.checkNumberOperands(expr.operator, left, right)
-            return left / right
-        elif expr.operator.type == TokenType.STAR:
-            self.checkNumberOperands(expr.operator, left, right)
-            return left * right
-        elif expr.operator.type == TokenType.PLUS:
-            if isinstance(left, str) and isinstance(right, str):
-                return left + right
-            elif isinstance(left, (float, int)) and isinstance(right, (float, int)):
-                return left + right
-            else:
-                raise LoxRuntimeError(
-                    expr.operator, "Operands must be two numbers or two strings.")
-                return None
-        elif expr.operator.type == TokenType.GREATER:
-            self.checkNumberOperands(expr.operator, left, right)
-            return left > right
-        elif expr.operator.type == TokenType.GREATER_EQUAL:
-            self.checkNumberOperands(expr.operator, left, right)
-            return left >= right
-        elif expr.operator.type == TokenType.LESS:
-            self.checkNumberOperands(expr.operator, left, right)
-            return left < right
-        elif expr.operator.type == TokenType.LESS_EQUAL:
-            self.checkNumberOperands(expr.operator, left, right)
-            return left <= right
-        elif expr.operator.type == TokenType.BANG_EQUAL:
-            return not self.isEqual(left, right)
-        elif expr.operator.type == TokenType.EQUAL_EQUAL:
-            return self.isEqual(left, right)
+        handler = expr.handler
+        if handler is None:
+            handler = expr.handler = self.binaryHandlers[expr.operator.type]
+        return handler(self, expr.operator, left, right)
+
+    # Operator handlers. Each node looks its handler up in the tables below
+    # on first evaluation and keeps it, so the operator type is never
+    # compared again. The float/float case is checked inline; an array
+    # operand goes to elementwise(), and anything else through
+    # checkNumberOperand(s) for the usual error.
+
+    def negate(self, operator, right):
+        if type(right) is not float:
+            if type(right) is LoxArray:
+                return right.negate()
+            self.checkNumberOperand(operator, right)
+        return -right
+
+    def bang(self, operator, right):
+        return right is None or right is False
+
+    def add(self, operator, left, right):
+        if type(left) is float and type(right) is float:
+            return left + right
+        elif isinstance(left, strings) and isinstance(right, strings):
+            return concat(left, right)
+        elif isinstance(left, (float, int)) and isinstance(right, (float, int)):
+            return left + right
+        elif type(left) is LoxArray or type(right) is LoxArray:
+            return self.elementwise(operator, left, right)
         else:
-            return None
+            raise LoxRuntimeError(
+                operator, "Operands must be two numbers or two strings.")
+
+    def subtract(self, operator, left, right):
+        if type(left) is not float or type(right) is not float:
+            if type(left) is LoxArray or type(right) is LoxArray:
+                return self.elementwise(operator, left, right)
+            self.checkNumberOperands(operator, left, right)
+        return left - right
+
+    def multiply(self, operator, left, right):
+        if type(left) is not float or type(right) is not float:
+            if type(left) is LoxArray or type(right) is LoxArray:
+                return self.elementwise(operator, left, right)
+            self.checkNumberOperands(operator, left, right)
+        return left * right
+
+    def divide(self, operator, left, right):
+        if type(left) is not float or type(right) is not float:
+            if type(left) is LoxArray or type(right) is LoxArray:
+                return self.elementwise(operator, left, right)
+            self.checkNumberOperands(operator, left, right)
+        try:
+            return left / right
+        except ZeroDivisionError:
+            raise LoxRuntimeError(operator, "Division by zero.")
+
+    def greater(self, operator, left, right):
+        if type(left) is not float or type(right) is not float:
+            if type(left) is LoxArray or type(right) is LoxArray:
+                return self.elementwise(operator, left, right)
+            self.checkNumberOperands(operator, left, right)
+        return left > right
+
+    def greaterEqual(self, operator, left, right):
+        if type(left) is not float or type(right) is not float:
+            if type(left) is LoxArray or type(right) is LoxArray:
+                return self.elementwise(operator, left, right)
+            self.checkNumberOperands(operator, left, right)
+        return left >= right
+
+    def less(self, operator, left, right):
+        if type(left) is not float or type(right) is not float:
+            if type(left) is LoxArray or type(right) is LoxArray:
+                return self.elementwise(operator, left, right)
+            self.checkNumberOperands(operator, left, right)
+        return left < right
+
+    def lessEqual(self, operator, left, right):
+        if type(left) is not float or type(right) is not float:
+            if type(left) is LoxArray or type(right) is LoxArray:
+                return self.elementwise(operator, left, right)
+            self.checkNumberOperands(operator, left, right)
+        return left <= right
+
+    def equal(self, operator, left, right):
+        return self.isEqual(left, right)
+
+    def notEqual(self, operator, left, right):
+        return not self.isEqual(left, right)
+
+    def elementwise(self, operator, left, right):
+        for operand in (left, right):
+            if type(operand) is not LoxArray and type(operand) is not float:
+                raise LoxRuntimeError(operator,
+                                      "Operands must be numbers or arrays.")
+        try:
+            return LoxArray.apply(operator.type, left, right)
+        except NativeError as error:
+            raise LoxRuntimeError(operator, error.message)
+
+    def logicalOr(self, expr):
+        left = self.evaluate(expr.left)
+        if left is not None and left is not False:
+            return left
+        return self.evaluate(expr.right)
+
+    def logicalAnd(self, expr):
+        left = self.evaluate(expr.left)
+        if left is None or left is False:
+            return left
+        return self.evaluate(expr.right)
+
+    unaryHandlers = {
+        TokenType.MINUS: negate,
+        TokenType.BANG: bang,
+    }
+
+    binaryHandlers = {
+        TokenType.PLUS: add,
+        TokenType.MINUS: subtract,
+        TokenType.STAR: multiply,
+        TokenType.SLASH: divide,
+        TokenType.GREATER: greater,
+        TokenType.GREATER_EQUAL: greaterEqual,
+        TokenType.LESS: less,
+        TokenType.LESS_EQUAL: lessEqual,
+        TokenType.EQUAL_EQUAL: equal,
+        TokenType.BANG_EQUAL: notEqual,
+    }
+
+    logicalHandlers = {
+        TokenType.OR: logicalOr,
+        TokenType.AND: logicalAnd,
+    }
 
     def isTruthy(self, object):
         if object is None or object is False:
@@ -111,16 +223,16 @@ class Interpreter():
             for statement in statements:
                 self.execute(statement)
         except LoxRuntimeError as error:
+            self.output.flush()
             self.lox.runtimeError(error)
+        finally:
+            self.output.flush()
 
     def stringify(self, object):
-        if object is None:
+        if type(object) is float:
+            return formatNumber(object)
+        elif object is None:
             return "nil"
-        elif isinstance(object, (float, int)):
-            text = str(object)
-            if text[-2:] == ".0":
-                text = text[:-2]
-            return text
         return str(object)
 
     def visitExpressionStmt(self, stmt):
@@ -129,7 +241,7 @@ class Interpreter():
 
     def visitPrintStmt(self, stmt):
         value = self.evaluate(stmt.expression)
-        print(self.stringify(value))
+        self.output.write(self.stringify(value))
         return None
 
     def execute(self, stmt):
@@ -140,19 +252,45 @@ class Interpreter():
         if stmt.initializer is not None:
             value = self.evaluate(stmt.initializer)
 
-        self.environment.define(stmt.name.lexeme, value)
+        if stmt.slot is None:
+            self.globals.define(stmt.name.lexeme, value)
+        else:
+            self.environment.values[stmt.slot] = value
         return None
 
     def visitVariableExpr(self, expr):
-        return self.environment.get(expr.name)
+        if expr.slot is None:
+            return self.globals.get(expr.name)
+
+        environment = self.environment
+        depth = expr.depth
+        while depth:
+            environment = environment.enclosing
+            depth -= 1
+        return environment.values[expr.slot]
 
     def visitAssignExpr(self, expr):
         value = self.evaluate(expr.value)
-        self.environment.assign(expr.name, value)
+
+        if expr.slot is None:
+            self.globals.assign(expr.name, value)
+            return value
+
+        environment = self.environment
+        depth = expr.depth
+        while depth:
+            environment = environment.enclosing
+            depth -= 1
+        environment.values[expr.slot] = value
         return value
 
     def visitBlockStmt(self, stmt):
-        self.executeBlock(stmt.statements, Environment(self.environment))
+        if stmt.size == 0:
+            for statement in stmt.statements:
+                self.execute(statement)
+        else:
+            self.executeBlock(stmt.statements,
+                              Environment(self.environment, stmt.size))
         return None
 
     def executeBlock(self, statements, environment):
@@ -176,16 +314,10 @@ class Interpreter():
         return None
 
     def visitLogicalExpr(self, expr):
-        left = self.evaluate(expr.left)
-
-        if expr.operator.type == TokenType.OR:
-            if self.isTruthy(left):
-                return left
-        else:
-            if not self.isTruthy(left):
-                return left
-
-        return self.evaluate(expr.right)
+        handler = expr.handler
+        if handler is None:
+            handler = expr.handler = self.logicalHandlers[expr.operator.type]
+        return handler(self, expr)
 
     def visitWhileStmt(self, stmt):
         while self.isTruthy(self.evaluate(stmt.condition)):
@@ -193,18 +325,163 @@ class Interpreter():
 
         return None
 
+    def visitForStmt(self, stmt):
+        # The loop variable's environment is made once. A block body runs
+        # its statements directly: in the loop's environment if it declares
+        # nothing, and otherwise in one environment of its own reused by
+        # every iteration, unless it declares functions (stmt.fresh), which
+        # must each capture a new one.
+        previous = self.environment
+        if stmt.size != 0:
+            self.environment = Environment(previous, stmt.size)
+
+        try:
+            if stmt.initializer is not None:
+                self.execute(stmt.initializer)
+
+            loop = self.environment
+            scope = loop
+            body = stmt.body
+            if type(body) is Block and not stmt.fresh:
+                statements = body.statements
+                if body.size != 0:
+                    scope = Environment(loop, body.size)
+            else:
+                statements = [body]
+
+            condition = stmt.condition
+            increment = stmt.increment
+            while self.isTruthy(self.evaluate(condition)):
+                self.environment = scope
+                for statement in statements:
+                    self.execute(statement)
+                self.environment = loop
+                if increment is not None:
+                    self.execute(increment)
+
+        finally:
+            self.environment = previous
+
+        return None
+
     def visitCallExpr(self, expr):
         callee = self.evaluate(expr.callee)
-        
-        arguments = {}
+
+        arguments = []
         for argument in expr.arguments:
             arguments.append(self.evaluate(argument))
-        
+
+        # Lox functions skip the generic LoxCallable protocol: the arity is
+        # the parameter count, and a call in tail position is handed back to
+        # the caller's callFunction loop rather than nested inside it.
+        if type(callee) is LoxFunction:
+            if len(arguments) != len(callee.declaration.params):
+                self.arityError(expr.paren, callee.arity(), arguments)
+            if expr.tail:
+                raise TailCall(callee, arguments)
+            return self.callFunction(callee, arguments)
+
         if not isinstance(callee, LoxCallable):
             raise LoxRuntimeError(expr.paren, "Can only call functions and classes.")
-        
-        function = callee   # this line may cause problem
-        return function.call(self, arguments)
+        if len(arguments) != callee.arity():
+            self.arityError(expr.paren, callee.arity(), arguments)
+        try:
+            return callee.call(self, arguments)
+        except NativeError as error:
+            raise LoxRuntimeError(expr.paren, error.message)
+
+    def arityError(self, paren, arity, arguments):
+        raise LoxRuntimeError(paren, "Expected " + str(arity) +
+                              " arguments but got " + str(len(arguments)) +
+                              ".")
+
+    def callFunction(self, function, arguments):
+        # The arguments list becomes the new environment's values: the
+        # parameters hold the first slots and the body's locals follow. A
+        # chain of tail calls returns one value, which is stored in the memo
+        # of every memoized function the chain passed through.
+        memos = None
+        while True:
+            memo = function.memo
+            if memo is not None:
+                key = memoKey(arguments)
+                results = memo.results
+                if LoxArray in key:
+                    # Arrays are mutable, so no result computed from one
+                    # can be reused.
+                    pass
+                elif key in results:
+                    memo.hits += 1
+                    results.move_to_end(key)
+                    value = results[key]
+                    break
+                else:
+                    memo.misses += 1
+                    if memos is None:
+                        memos = []
+                    memos.append((memo, key))
+
+            declaration = function.declaration
+            size = declaration.size
+            if size > len(arguments):
+                arguments += [None] * (size - len(arguments))
+            environment = Environment(function.closure)
+            environment.values = arguments
+
+            previous = self.environment
+            self.environment = environment
+            try:
+                self.executeBody(declaration)
+                value = None
+                break
+            except ReturnValue as returned:
+                value = returned.value
+                break
+            except TailCall as call:
+                function = call.function
+                arguments = call.arguments
+            except RecursionError:
+                raise LoxRuntimeError(declaration.name, "Stack overflow.")
+            finally:
+                self.environment = previous
+
+        if memos is not None:
+            for memo, key in memos:
+                memo.store(key, value)
+        return value
+
+    def executeBody(self, declaration):
+        for statement in declaration.body:
+            self.execute(statement)
+
+    def memoize(self, function, owner):
+        # Functions the purity analysis proved pure share one memo per
+        # declaration, as every closure of it computes the same results;
+        # memoize() gives the function value it is passed its own.
+        if self.memoSize <= 0 or function.memo is not None:
+            return
+        memo = self.memos.get(owner)
+        if memo is None:
+            memo = self.memos[owner] = Memo(
+                function.declaration.name.lexeme, self.memoSize)
+        function.memo = memo
+
+    def visitFunctionStmt(self, stmt):
+        function = LoxFunction(stmt, self.environment)
+        if stmt.pure:
+            self.memoize(function, stmt)
+        if stmt.slot is None:
+            self.globals.define(stmt.name.lexeme, function)
+        else:
+            self.environment.values[stmt.slot] = function
+        return None
+
+    def visitReturnStmt(self, stmt):
+        value = None
+        if stmt.value is not None:
+            value = self.evaluate(stmt.value)
+
+        raise ReturnValue(value)
 
 
 
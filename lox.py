@@ -1,60 +1,259 @@
 #!/usr/bin/env python3
 
+import os
 import sys
-from scanner import Scanner
-from parser import Parser
-from astPrinter import AstPrinter
+from tokenType import TokenType
+from programCache import ProgramCache
 from interpreter import Interpreter
+from error import LoxRuntimeError
+
+# The front end, the optimizer and the closure, vm and python engines are
+# imported where they are first needed. A run that hits the program cache
+# then never loads re or the parser, and no run pays for the ast module,
+# which alone used to cost more than the rest of startup.
 
 
 class Lox:
-    def __init__(self):
+    engines = ("tree", "closure", "vm", "python")
+    # Each Lox call nests about a dozen Python frames in the tree walker, so
+    # the default limit of 1000 would stop recursion at ~80 Lox calls.
+    recursionLimit = 100000
+    # Sources at least this long are parsed from a TokenBuffer rather than
+    # a list of Tokens: it takes about a quarter less memory, but parsing
+    # builds a Token for every name and operator the tree keeps, which makes
+    # it slower.
+    bufferThreshold = 4 * 1024 * 1024
+
+    def __init__(self, engine="tree"):
+        if sys.getrecursionlimit() < self.recursionLimit:
+            sys.setrecursionlimit(self.recursionLimit)
+        self.engine = engine
+        self.emitPath = None
+        self.stream = False
+        self.optimize = False
+        self.cache = ProgramCache()
+        self.profilePath = None
+        self.coveragePath = None
+        self.counters = None
+        self.memoSize = 1024
+        self.memoStats = False
+        self.memos = {}
+        # None flushes print output per line on a terminal and in blocks
+        # otherwise.
+        self.lineBuffered = None
+        self.asyncMode = False
         self.hadError = False
         self.hadRuntimeError = False
 
     def runFile(self, path):
-        file = open(path, "r")
-        source = file.read()
-        file.close()
+        profiler = None
+        if self.profilePath is not None:
+            from profiler import Profiler
+            profiler = Profiler()
+            profiler.start()
+
+        # A path of "-" reads the script from standard input.
+        source = None
+        file = sys.stdin if path == "-" else open(path, "r")
+        if self.stream:
+            self.runStream(file)
+            file.close()
+        else:
+            source = file.read()
+            file.close()
+
+            if self.cache is None:
+                self.run(source)
+            else:
+                self.runCached(source)
+
+        if profiler is not None:
+            profiler.stop()
+            profiler.report(sys.stderr, source)
+            profiler.writeCollapsed(self.profilePath, os.path.basename(path))
+
+        if self.counters is not None and source is not None:
+            self.counters.writeReport(self.coveragePath, source)
+            print(self.counters.summary(), file=sys.stderr)
+
+        if self.memoStats:
+            for memo in self.memos.values():
+                print("memo " + str(memo), file=sys.stderr)
 
-        self.run(source)
         if self.hadError:
             sys.exit(65)
         elif self.hadRuntimeError:
             sys.exit(70)
 
     def runPrompt(self):
-        while True:
-            try:
-                line = input("> ")
-                self.run(line)
-                self.hadError = False
-            except EOFError as error:
-                break
+        from session import Session
+
+        Session(self).loop()
 
     def run(self, source):
-        scanner = Scanner(source, self)
-        tokens = scanner.scanTokens()
-        # for token in tokens:
-        #    print(token)
+        statements = self.compile(source)
+        if statements is not None:
+            self.execute(statements)
+
+    def runCached(self, source):
+        # Only programs that scanned, parsed and resolved cleanly are stored,
+        # so a cache hit never has errors to report.
+        key = self.cache.key(source, self.optimize)
+        statements = self.cache.load(key)
+        if statements is None:
+            statements = self.compile(source)
+            if statements is None:
+                return
+            self.cache.store(key, statements)
+        self.execute(statements)
 
-        parser = Parser(tokens, self)
+    def compile(self, source):
+        # benchmarks/run.py times each of these phases on its own.
+        return self.resolve(self.parse(self.scan(source)))
+
+    def scan(self, source):
+        from regexScanner import RegexScanner
+
+        scanner = RegexScanner(source, self)
+        if len(source) < self.bufferThreshold:
+            return scanner.scanTokens()
+        return scanner.scanBuffer()
+
+    def parse(self, tokens):
+        from parser import Parser, BufferParser
+
+        if type(tokens) is list:
+            parser = Parser(tokens, self)
+        else:
+            parser = BufferParser(tokens, self)
         statements = parser.parse()
         # for statement in statements:
         #    print(statement)
 
         if self.hadError:
+            return None
+        return statements
+
+    def resolve(self, statements):
+        # Optimizes with -O, resolves, and marks the pure functions.
+        if statements is None:
+            return None
+
+        from resolver import Resolver
+
+        if self.optimize:
+            from optimizer import Optimizer
+            statements = Optimizer().optimize(statements)
+
+        resolver = Resolver(self)
+        resolver.resolve(statements)
+
+        if self.hadError:
+            return None
+
+        from purity import Purity
+        Purity().analyze(statements)
+        return statements
+
+    def execute(self, statements):
+        if self.engine == "python":
+            self.runPython(statements)
+        elif self.asyncMode:
+            from scheduler import Scheduler
+            Scheduler(self.createInterpreter()).run(statements)
+        else:
+            interpreter = self.createInterpreter()
+            interpreter.interpret(statements)
+
+    def runStream(self, source):
+        # Each top-level declaration is resolved and executed as soon as it
+        # has been parsed, so neither the token list nor the statement list
+        # is ever held in full. A syntax error stops execution, but parsing
+        # goes on so that the remaining errors are still reported.
+        from regexScanner import RegexScanner
+        from parser import Parser
+        from resolver import Resolver
+
+        scanner = RegexScanner(source, self)
+        parser = Parser(scanner.tokenStream(), self)
+        resolver = Resolver(self)
+        optimizer = None
+        if self.optimize:
+            from optimizer import Optimizer
+            optimizer = Optimizer()
+        interpreter = self.createInterpreter()
+
+        for statement in parser.declarations():
+            if self.hadError:
+                continue
+
+            statements = [statement]
+            if optimizer is not None:
+                statements = optimizer.optimize(statements)
+
+            resolver.resolve(statements)
+            if not self.hadError:
+                interpreter.interpret(statements)
+                if self.hadRuntimeError:
+                    return
+
+    def createInterpreter(self):
+        if self.engine == "vm":
+            from vm import VM
+            return VM(self)
+        elif self.engine == "closure":
+            from closureCompiler import ClosureInterpreter
+            return ClosureInterpreter(self)
+        elif self.coveragePath is not None:
+            from instrumentation import Counters, InstrumentedInterpreter
+            if self.counters is None:
+                self.counters = Counters()
+            return InstrumentedInterpreter(self, self.counters)
+        else:
+            return Interpreter(self)
+
+    def runPython(self, statements):
+        import ast
+        from transpiler import Transpiler
+
+        transpiler = Transpiler(self)
+        module = transpiler.transpile(statements)
+        if self.hadError:
+            return
+        if transpiler.fallback is not None:
+            # The tree interpreter can run what the transpiler cannot
+            # translate, but there is then no Python to emit.
+            line, reason = transpiler.fallback
+            if self.emitPath is not None:
+                self.error(line, reason + " cannot be translated to Python.")
+            else:
+                self.createInterpreter().interpret(statements)
             return
+        if self.emitPath is not None:
+            file = open(self.emitPath, "w")
+            file.write(ast.unparse(module) + "\n")
+            file.close()
 
-        interpreter = Interpreter(self)
-        interpreter.interpret(statements)
+        import loxRuntime
+        from output import Output
+
+        output = loxRuntime.output = Output(sys.stdout, self.lineBuffered)
+        namespace = {"__name__": "__lox__"}
+        exec(compile(module, "<lox>", "exec"), namespace)
+        try:
+            namespace["main"]()
+        except LoxRuntimeError as error:
+            output.flush()
+            self.runtimeError(error)
+        finally:
+            output.flush()
 
     def error(self, line, message):
         self.report(line, "", message)
 
     def error2(self, token, message):
         if token.type == TokenType.EOF:
-            self.report(token.line, "at end", message)
+            self.report(token.line, " at end", message)
         else:
             self.report(token.line, " at '" + token.lexeme + "'", message)
 
@@ -63,17 +262,106 @@ class Lox:
               ": ", message, file=sys.stderr, sep="")
         self.hadError = True
 
-    def runtimeError(error):
+    def runtimeError(self, error):
         print(error.message + "\n[line " +
-              error.token.line + "]", file=sys.stderr)
-        self.hadRuntimeError = true
+              str(error.token.line) + "]", file=sys.stderr)
+        self.hadRuntimeError = True
+
+
+def usage():
+    print("Usage: lox.py [--engine=" + "|".join(Lox.engines) + "] "
+          "[--compile-py] [--emit-py=path] [--stream] [-O] [--no-cache] "
+          "[--profile[=path]] [--coverage[=path]] [--memo-size=N] "
+          "[--memo-stats] [--flush=line|block] [--async] [script|-]\n"
+          "       lox.py [options] --batch directory [-j N]",
+          file=sys.stderr)
+    sys.exit(64)
 
 
 if __name__ == "__main__":
     lox = Lox()
-    if len(sys.argv) > 2:
-        sys.exit(64)
-    elif len(sys.argv) == 2:
-        lox.runFile(sys.argv[1])
+    args = []
+    batch = False
+    jobs = None
+    argv = iter(sys.argv[1:])
+    for arg in argv:
+        if arg.startswith("--engine="):
+            lox.engine = arg[len("--engine="):]
+            if lox.engine not in Lox.engines:
+                usage()
+        elif arg == "--compile-py":
+            lox.engine = "python"
+        elif arg.startswith("--emit-py="):
+            lox.engine = "python"
+            lox.emitPath = arg[len("--emit-py="):]
+        elif arg == "-O":
+            lox.optimize = True
+        elif arg == "--profile":
+            lox.profilePath = "lox.collapsed"
+        elif arg.startswith("--profile="):
+            lox.profilePath = arg[len("--profile="):]
+        elif arg == "--coverage":
+            lox.coveragePath = "lox.cov"
+        elif arg.startswith("--coverage="):
+            lox.coveragePath = arg[len("--coverage="):]
+        elif arg.startswith("--memo-size="):
+            size = arg[len("--memo-size="):]
+            if not size.isdigit():
+                usage()
+            lox.memoSize = int(size)
+        elif arg == "--memo-stats":
+            lox.memoStats = True
+        elif arg == "--flush=line":
+            lox.lineBuffered = True
+        elif arg == "--flush=block":
+            lox.lineBuffered = False
+        elif arg == "--no-cache":
+            lox.cache = None
+        elif arg == "--stream":
+            lox.stream = True
+        elif arg == "--async":
+            lox.asyncMode = True
+        elif arg == "--batch":
+            batch = True
+        elif arg.startswith("-j"):
+            jobs = arg[len("-j"):] or next(argv, "")
+            if not jobs.isdigit() or int(jobs) < 1:
+                usage()
+            jobs = int(jobs)
+        elif arg.startswith("-") and arg != "-":
+            usage()
+        else:
+            args.append(arg)
+
+    if batch:
+        # Each script gets its own output, so only options that change how
+        # a script runs apply.
+        if (len(args) != 1 or lox.stream or lox.emitPath is not None or
+                lox.profilePath is not None or lox.coveragePath is not None):
+            usage()
+        from batch import runBatch
+        runBatch(lox, args[0], jobs or os.cpu_count())
+    elif jobs is not None or len(args) > 1:
+        usage()
+    elif lox.stream and (lox.engine == "python" or len(args) == 0):
+        usage()
+    elif lox.profilePath is not None and (lox.engine != "tree" or
+                                          len(args) == 0):
+        # The profiler reads the tree interpreter's own stack.
+        usage()
+    elif lox.coveragePath is not None and (lox.engine != "tree" or
+                                           lox.stream or len(args) == 0 or
+                                           lox.profilePath is not None):
+        # The counting interpreter runs statements through its own execute,
+        # whose frames the profiler does not look for.
+        usage()
+    elif lox.asyncMode and (lox.engine not in ("tree", "closure") or
+                            lox.stream or lox.profilePath is not None or
+                            len(args) == 0):
+        # Tasks run on their own threads, where the profiler's signal
+        # handler cannot see them.
+        usage()
+    elif len(args) == 1:
+        lox.runFile(args[0])
     else:
         lox.runPrompt()
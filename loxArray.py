@@ -0,0 +1,141 @@
+import os
+
+from tokenType import TokenType
+from error import NativeError
+from output import formatNumber
+
+# The modules arrays are built on are imported when the first array is
+# made, by load(): NumPy takes longer to import than all of the
+# interpreter's startup, and the array module brings collections with it.
+# LOX_NUMPY=0 in the environment keeps arrays on array('d') even when NumPy
+# is installed; both backends must give the same results and errors.
+numpy = None
+array = None
+repeat = None
+operator = None
+operators = None
+loaded = False
+
+
+def load():
+    global numpy, array, repeat, operator, operators, loaded
+    if not loaded:
+        loaded = True
+        import operator
+        from array import array
+        from itertools import repeat
+        operators = {
+            TokenType.PLUS: operator.add,
+            TokenType.MINUS: operator.sub,
+            TokenType.STAR: operator.mul,
+            TokenType.SLASH: operator.truediv,
+            TokenType.GREATER: operator.gt,
+            TokenType.GREATER_EQUAL: operator.ge,
+            TokenType.LESS: operator.lt,
+            TokenType.LESS_EQUAL: operator.le,
+        }
+        if os.environ.get("LOX_NUMPY") != "0":
+            try:
+                import numpy
+            except ImportError:
+                pass
+    return numpy
+
+
+class LoxArray:
+    # A fixed-length vector of numbers, backed by a NumPy float64 array when
+    # NumPy is installed and by array('d') otherwise. Arithmetic and ordering
+    # comparisons with an array operand apply element by element in a single
+    # native loop, the other operand being an array of the same length or a
+    # number; comparisons give 1 or 0 per element. == and != compare
+    # identity, as for every other object.
+    # Every array is made by zeros() or range(), or from another array, so
+    # load() has run before any other method.
+    __slots__ = ("values",)
+
+    def __init__(self, values):
+        self.values = values
+
+    @classmethod
+    def zeros(cls, size):
+        if load() is not None:
+            return cls(numpy.zeros(size))
+        return cls(array("d", bytes(8 * size)))
+
+    @classmethod
+    def range(cls, size):
+        if load() is not None:
+            return cls(numpy.arange(size, dtype=float))
+        return cls(array("d", range(size)))
+
+    @classmethod
+    def apply(cls, type, left, right):
+        function = operators[type]
+        if type == TokenType.SLASH:
+            divisor = right.values if isinstance(right, LoxArray) else right
+            if (divisor == 0 if isinstance(divisor, float) else 0.0 in divisor):
+                raise NativeError("Division by zero.")
+
+        if isinstance(left, LoxArray) and isinstance(right, LoxArray):
+            if len(left.values) != len(right.values):
+                raise NativeError("Arrays must have the same length.")
+            a = left.values
+            b = right.values
+        elif isinstance(left, LoxArray):
+            a = left.values
+            b = right
+        else:
+            a = left
+            b = right.values
+
+        if numpy is not None:
+            result = function(a, b)
+            if result.dtype == bool:
+                result = result.astype(float)
+            return cls(result)
+
+        if not isinstance(a, array):
+            a = repeat(a, len(b))
+        elif not isinstance(b, array):
+            b = repeat(b, len(a))
+        return cls(array("d", map(function, a, b)))
+
+    def negate(self):
+        if numpy is not None:
+            return LoxArray(-self.values)
+        return LoxArray(array("d", map(operator.neg, self.values)))
+
+    def index(self, index):
+        if not isinstance(index, float) or not index.is_integer():
+            raise NativeError("Array index must be an integer.")
+        if not 0 <= index < len(self.values):
+            raise NativeError("Array index out of range.")
+        return int(index)
+
+    def get(self, index):
+        return float(self.values[self.index(index)])
+
+    def set(self, index, value):
+        if not isinstance(value, float):
+            raise NativeError("Array elements must be numbers.")
+        self.values[self.index(index)] = value
+
+    def length(self):
+        return float(len(self.values))
+
+    def sum(self):
+        return float(sum(self.values) if numpy is None else self.values.sum())
+
+    def min(self):
+        if not len(self.values):
+            raise NativeError("Array is empty.")
+        return float(min(self.values) if numpy is None else self.values.min())
+
+    def max(self):
+        if not len(self.values):
+            raise NativeError("Array is empty.")
+        return float(max(self.values) if numpy is None else self.values.max())
+
+    def __str__(self):
+        return "[" + ", ".join(formatNumber(float(value))
+                               for value in self.values) + "]"
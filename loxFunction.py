@@ -0,0 +1,89 @@
+from loxCallable import LoxCallable
+
+
+class LoxFunction(LoxCallable):
+    __slots__ = ("declaration", "closure", "memo")
+
+    def __init__(self, declaration, closure):
+        self.declaration = declaration
+        self.closure = closure
+        self.memo = None
+
+    def arity(self):
+        return len(self.declaration.params)
+
+    def call(self, interpreter, arguments):
+        return interpreter.callFunction(self, arguments)
+
+    def __str__(self):
+        return "<fn " + self.declaration.name.lexeme + ">"
+
+
+class Closure(LoxCallable):
+    # A function value of the vm engine: a compiled function and the
+    # variables it captured from the functions around it.
+    __slots__ = ("function", "upvalues", "memo")
+
+    def __init__(self, function, upvalues):
+        self.function = function
+        self.upvalues = upvalues
+        self.memo = None
+
+    def arity(self):
+        return self.function.arity
+
+    def call(self, interpreter, arguments):
+        return interpreter.run(self, arguments)
+
+    def __str__(self):
+        return "<fn " + self.function.name.lexeme + ">"
+
+
+class ReturnValue(Exception):
+    # Unwinds a function body from a return statement to its call.
+    def __init__(self, value):
+        self.value = value
+
+
+class TailCall(Exception):
+    # Raised by a call in tail position instead of making the call: the
+    # loop in Interpreter.callFunction catches it and runs the callee in
+    # place of the function that is returning, so tail calls do not nest.
+    def __init__(self, function, arguments):
+        self.function = function
+        self.arguments = arguments
+
+
+def memoKey(arguments):
+    # A number is keyed by its bits, as Chunk.addConstant does, since
+    # 0.0 == -0.0 but -x differs between them. The key also holds each
+    # argument's type, since true == 1 in Python but not in Lox, and a
+    # string could spell a number's bits.
+    return (*[argument.hex() if type(argument) is float else argument
+              for argument in arguments], *map(type, arguments))
+
+
+class Memo:
+    # A least-recently-used cache of one function's results, keyed on its
+    # arguments by memoKey().
+    __slots__ = ("name", "size", "results", "hits", "misses")
+
+    def __init__(self, name, size):
+        self.name = name
+        self.size = size
+        # collections is only imported once a function is memoized.
+        from collections import OrderedDict
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def store(self, key, value):
+        results = self.results
+        results[key] = value
+        if len(results) > self.size:
+            results.popitem(last=False)
+
+    def __str__(self):
+        return ("%s: %d hits, %d misses, %d of %d cached" %
+                (self.name, self.hits, self.misses, len(self.results),
+                 self.size))
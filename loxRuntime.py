@@ -0,0 +1,144 @@
+import sys
+
+from tokenType import TokenType
+from loxToken import Token
+from environment import GlobalEnvironment
+from error import LoxRuntimeError, NativeError
+from loxCallable import LoxCallable
+from natives import defineNatives
+from loxArray import LoxArray
+from rope import concat, strings
+from output import Output, formatNumber
+
+number = (float, int)
+
+# Print statements write here. Lox.runPython replaces it with one for the
+# current stdout and flush policy; a module run as a script uses this one.
+output = Output(sys.stdout)
+
+# The natives a translated program reads its native globals from.
+natives = GlobalEnvironment()
+defineNatives(natives)
+
+
+class Runtime:
+    # What a native sees as the interpreter calling it. Programs with Lox
+    # functions are not translated and --async needs the tree walker, so
+    # there is never a scheduler or anything to memoize.
+    scheduler = None
+
+
+runtime = Runtime()
+
+
+def operandError(type, lexeme, line, message):
+    return LoxRuntimeError(Token(type, lexeme, None, line), message)
+
+
+def arrayOperation(kind, lexeme, left, right, line,
+                   message="Operands must be numbers."):
+    # The slow path of an operator whose operands are not both numbers: an
+    # array operand makes it elementwise, as in Interpreter.elementwise.
+    if type(left) is not LoxArray and type(right) is not LoxArray:
+        raise operandError(kind, lexeme, line, message)
+    for operand in (left, right):
+        if type(operand) is not LoxArray and type(operand) is not float:
+            raise operandError(kind, lexeme, line,
+                               "Operands must be numbers or arrays.")
+    try:
+        return LoxArray.apply(kind, left, right)
+    except NativeError as error:
+        raise operandError(kind, lexeme, line, error.message)
+
+
+def add(left, right, line):
+    if isinstance(left, strings) and isinstance(right, strings):
+        return concat(left, right)
+    elif isinstance(left, number) and isinstance(right, number):
+        return left + right
+    return arrayOperation(TokenType.PLUS, "+", left, right, line,
+                          "Operands must be two numbers or two strings.")
+
+
+def subtract(left, right, line):
+    if not (isinstance(left, number) and isinstance(right, number)):
+        return arrayOperation(TokenType.MINUS, "-", left, right, line)
+    return left - right
+
+
+def multiply(left, right, line):
+    if not (isinstance(left, number) and isinstance(right, number)):
+        return arrayOperation(TokenType.STAR, "*", left, right, line)
+    return left * right
+
+
+def divide(left, right, line):
+    if not (isinstance(left, number) and isinstance(right, number)):
+        return arrayOperation(TokenType.SLASH, "/", left, right, line)
+    if right == 0:
+        raise operandError(TokenType.SLASH, "/", line, "Division by zero.")
+    return left / right
+
+
+def greater(left, right, line):
+    if not (isinstance(left, number) and isinstance(right, number)):
+        return arrayOperation(TokenType.GREATER, ">", left, right, line)
+    return left > right
+
+
+def greaterEqual(left, right, line):
+    if not (isinstance(left, number) and isinstance(right, number)):
+        return arrayOperation(TokenType.GREATER_EQUAL, ">=", left, right, line)
+    return left >= right
+
+
+def less(left, right, line):
+    if not (isinstance(left, number) and isinstance(right, number)):
+        return arrayOperation(TokenType.LESS, "<", left, right, line)
+    return left < right
+
+
+def lessEqual(left, right, line):
+    if not (isinstance(left, number) and isinstance(right, number)):
+        return arrayOperation(TokenType.LESS_EQUAL, "<=", left, right, line)
+    return left <= right
+
+
+def negate(right, line):
+    if type(right) is LoxArray:
+        return right.negate()
+    if not isinstance(right, number):
+        raise operandError(TokenType.MINUS, "-", line,
+                           "Operand must be a number.")
+    return -right
+
+
+def undefined(name, line):
+    raise LoxRuntimeError(Token(TokenType.IDENTIFIER, name, None, line),
+                          "Undefined variable '" + name + "'.")
+
+
+def native(name):
+    return natives.values[name]
+
+
+def call(callee, arguments, line):
+    paren = Token(TokenType.RIGHT_PAREN, ")", None, line)
+    if not isinstance(callee, LoxCallable):
+        raise LoxRuntimeError(paren, "Can only call functions and classes.")
+    if len(arguments) != callee.arity():
+        raise LoxRuntimeError(paren, "Expected " + str(callee.arity()) +
+                              " arguments but got " + str(len(arguments)) +
+                              ".")
+    try:
+        return callee.call(runtime, arguments)
+    except NativeError as error:
+        raise LoxRuntimeError(paren, error.message)
+
+
+def stringify(object):
+    if type(object) is float:
+        return formatNumber(object)
+    elif object is None:
+        return "nil"
+    return str(object)
@@ -0,0 +1,185 @@
+import time
+
+from error import NativeError
+from loxCallable import LoxCallable
+from loxFunction import LoxFunction, Closure
+from loxArray import LoxArray
+
+
+class NativeFunction(LoxCallable):
+    # A pure native returns a result that depends on its arguments alone,
+    # so Lox functions calling it can still be memoized.
+    __slots__ = ("name", "parameters", "function", "pure")
+
+    def __init__(self, name, parameters, function, pure=False):
+        self.name = name
+        self.parameters = parameters
+        self.function = function
+        self.pure = pure
+
+    def arity(self):
+        return self.parameters
+
+    def call(self, interpreter, arguments):
+        return self.function(*arguments)
+
+    def __str__(self):
+        return "<native fn>"
+
+
+class Memoize(LoxCallable):
+    # memoize(f) caches f's results whether or not the purity analysis
+    # could prove it pure, and returns f.
+    __slots__ = ()
+
+    name = "memoize"
+    pure = False
+
+    def arity(self):
+        return 1
+
+    def call(self, interpreter, arguments):
+        function = arguments[0]
+        if type(function) is LoxFunction or type(function) is Closure:
+            interpreter.memoize(function, function)
+        return function
+
+    def __str__(self):
+        return "<native fn>"
+
+
+class Task:
+    # A spawned call. Without --async it has already run by the time
+    # spawn() returns it; with --async the Scheduler runs it and fills in
+    # the fields it uses to suspend and resume the call.
+    __slots__ = ("function", "result", "done", "cancelled", "environment",
+                 "request", "go", "yielded", "future", "exception")
+
+    def __init__(self, function):
+        self.function = function
+        self.result = None
+        self.done = False
+        self.cancelled = False
+        self.environment = None
+        self.request = None
+        self.go = None
+        self.yielded = None
+        self.future = None
+        self.exception = None
+
+    def __str__(self):
+        return "<task>"
+
+
+class Spawn(LoxCallable):
+    # spawn(f) starts a task calling f with no arguments and returns it.
+    __slots__ = ()
+
+    name = "spawn"
+    pure = False
+
+    def arity(self):
+        return 1
+
+    def call(self, interpreter, arguments):
+        function = arguments[0]
+        if not isinstance(function, LoxCallable) or function.arity() != 0:
+            raise NativeError("Can only spawn a function with no parameters.")
+        task = Task(function)
+        if interpreter.scheduler is None:
+            task.result = function.call(interpreter, [])
+            task.done = True
+        else:
+            interpreter.scheduler.spawn(task)
+        return task
+
+    def __str__(self):
+        return "<native fn>"
+
+
+class Sleep(LoxCallable):
+    # sleep(seconds) lets other tasks run for at least that long, or blocks
+    # the whole program without --async.
+    __slots__ = ()
+
+    name = "sleep"
+    pure = False
+
+    def arity(self):
+        return 1
+
+    def call(self, interpreter, arguments):
+        seconds = arguments[0]
+        if not isinstance(seconds, float) or not seconds >= 0:
+            raise NativeError("Sleep time must be a non-negative number.")
+        if interpreter.scheduler is None:
+            time.sleep(seconds)
+        else:
+            interpreter.scheduler.sleep(seconds)
+        return None
+
+    def __str__(self):
+        return "<native fn>"
+
+
+class Await(LoxCallable):
+    # await(task) waits for the task to finish and returns its result.
+    __slots__ = ()
+
+    name = "await"
+    pure = False
+
+    def arity(self):
+        return 1
+
+    def call(self, interpreter, arguments):
+        task = arguments[0]
+        if type(task) is not Task:
+            raise NativeError("Argument must be a task.")
+        if not task.done:
+            interpreter.scheduler.join(task)
+        return task.result
+
+    def __str__(self):
+        return "<native fn>"
+
+
+def clock():
+    return time.time()
+
+
+def checkArray(value):
+    if type(value) is not LoxArray:
+        raise NativeError("Argument must be an array.")
+    return value
+
+
+def checkSize(size):
+    if not isinstance(size, float) or not size.is_integer() or size < 0:
+        raise NativeError("Array size must be a non-negative integer.")
+    return int(size)
+
+
+# array(n) and range(n) are impure: each call returns a new mutable array.
+natives = (
+    NativeFunction("clock", 0, clock),
+    Memoize(),
+    Spawn(),
+    Sleep(),
+    Await(),
+    NativeFunction("array", 1, lambda size: LoxArray.zeros(checkSize(size))),
+    NativeFunction("range", 1, lambda size: LoxArray.range(checkSize(size))),
+    NativeFunction("get", 2, lambda a, index: checkArray(a).get(index), True),
+    NativeFunction("set", 3,
+                   lambda a, index, value: checkArray(a).set(index, value)),
+    NativeFunction("len", 1, lambda a: checkArray(a).length(), True),
+    NativeFunction("sum", 1, lambda a: checkArray(a).sum(), True),
+    NativeFunction("min", 1, lambda a: checkArray(a).min(), True),
+    NativeFunction("max", 1, lambda a: checkArray(a).max(), True),
+)
+pureNatives = frozenset(native.name for native in natives if native.pure)
+
+
+def defineNatives(globals):
+    for native in natives:
+        globals.define(native.name, native)
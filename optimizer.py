@@ -0,0 +1,198 @@
+from tokenType import TokenType
+from expr import *
+from stmt import *
+
+
+def countNodes(nodes):
+    count = 0
+    pending = list(nodes)
+    while pending:
+        node = pending.pop()
+        if isinstance(node, list):
+            pending.extend(node)
+        elif isinstance(node, (Expr, Stmt)):
+            count += 1
+            pending.extend(getattr(node, name) for name in node.__slots__)
+    return count
+
+
+class Optimizer:
+    # Returned by fold() when evaluating the operator at compile time would
+    # fail, so the node is kept and the error is raised from its own token.
+    unfoldable = object()
+
+    def optimize(self, statements):
+        optimized = []
+        for statement in statements:
+            statement = statement.accept(self)
+            if statement is not None:
+                optimized.append(statement)
+        return optimized
+
+    def optimizeBranch(self, stmt):
+        optimized = stmt.accept(self)
+        if optimized is None:
+            return self.at(Block([]), stmt)
+        return optimized
+
+    def at(self, optimized, stmt):
+        # Rebuilt statements keep the source line of the original.
+        optimized.line = stmt.line
+        return optimized
+
+    def isTruthy(self, value):
+        return value is not None and value is not False
+
+    def isNumber(self, value):
+        return isinstance(value, (float, int))
+
+    def fold(self, type, left, right):
+        if type == TokenType.EQUAL_EQUAL:
+            return left == right
+        elif type == TokenType.BANG_EQUAL:
+            return not left == right
+        elif type == TokenType.PLUS:
+            if isinstance(left, str) and isinstance(right, str):
+                return left + right
+
+        if not (self.isNumber(left) and self.isNumber(right)):
+            return self.unfoldable
+
+        if type == TokenType.PLUS:
+            return left + right
+        elif type == TokenType.MINUS:
+            return left - right
+        elif type == TokenType.STAR:
+            return left * right
+        elif type == TokenType.SLASH:
+            if right == 0:
+                return self.unfoldable
+            return left / right
+        elif type == TokenType.GREATER:
+            return left > right
+        elif type == TokenType.GREATER_EQUAL:
+            return left >= right
+        elif type == TokenType.LESS:
+            return left < right
+        elif type == TokenType.LESS_EQUAL:
+            return left <= right
+        return self.unfoldable
+
+    def visitExpressionStmt(self, stmt):
+        expression = stmt.expression.accept(self)
+        if isinstance(expression, Literal):
+            return None
+        return self.at(Expression(expression), stmt)
+
+    def visitPrintStmt(self, stmt):
+        return self.at(Print(stmt.expression.accept(self)), stmt)
+
+    def visitVarStmt(self, stmt):
+        initializer = stmt.initializer
+        if initializer is not None:
+            initializer = initializer.accept(self)
+        return self.at(Var(stmt.name, initializer), stmt)
+
+    def visitBlockStmt(self, stmt):
+        return self.at(Block(self.optimize(stmt.statements)), stmt)
+
+    def visitIfStmt(self, stmt):
+        condition = stmt.condition.accept(self)
+
+        if isinstance(condition, Literal):
+            if self.isTruthy(condition.value):
+                return stmt.thenBranch.accept(self)
+            elif stmt.elseBranch is not None:
+                return stmt.elseBranch.accept(self)
+            return None
+
+        elseBranch = stmt.elseBranch
+        if elseBranch is not None:
+            elseBranch = elseBranch.accept(self)
+        return self.at(If(condition, self.optimizeBranch(stmt.thenBranch),
+                          elseBranch), stmt)
+
+    def visitWhileStmt(self, stmt):
+        condition = stmt.condition.accept(self)
+
+        if isinstance(condition, Literal) and not self.isTruthy(condition.value):
+            return None
+        return self.at(While(condition, self.optimizeBranch(stmt.body)), stmt)
+
+    def visitForStmt(self, stmt):
+        initializer = stmt.initializer
+        if initializer is not None:
+            initializer = initializer.accept(self)
+        condition = stmt.condition.accept(self)
+
+        if isinstance(condition, Literal) and not self.isTruthy(condition.value):
+            if initializer is None:
+                return None
+            # The initializer still runs, in the loop's own scope.
+            return self.at(Block([initializer]), stmt)
+
+        increment = stmt.increment
+        if increment is not None:
+            increment = increment.accept(self)
+        return self.at(For(initializer, condition, increment,
+                           self.optimizeBranch(stmt.body)), stmt)
+
+    def visitFunctionStmt(self, stmt):
+        return self.at(Function(stmt.name, stmt.params,
+                                self.optimize(stmt.body)), stmt)
+
+    def visitReturnStmt(self, stmt):
+        value = stmt.value
+        if value is not None:
+            value = value.accept(self)
+        return self.at(Return(stmt.keyword, value), stmt)
+
+    def visitLiteralExpr(self, expr):
+        return expr
+
+    def visitVariableExpr(self, expr):
+        return expr
+
+    def visitGroupingExpr(self, expr):
+        return expr.expression.accept(self)
+
+    def visitAssignExpr(self, expr):
+        return Assign(expr.name, expr.value.accept(self))
+
+    def visitUnaryExpr(self, expr):
+        right = expr.right.accept(self)
+
+        if isinstance(right, Literal):
+            if expr.operator.type == TokenType.BANG:
+                return Literal(not self.isTruthy(right.value))
+            elif self.isNumber(right.value):
+                return Literal(-right.value)
+
+        return Unary(expr.operator, right)
+
+    def visitBinaryExpr(self, expr):
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+
+        if isinstance(left, Literal) and isinstance(right, Literal):
+            value = self.fold(expr.operator.type, left.value, right.value)
+            if value is not self.unfoldable:
+                return Literal(value)
+
+        return Binary(left, expr.operator, right)
+
+    def visitLogicalExpr(self, expr):
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+
+        if isinstance(left, Literal):
+            if expr.operator.type == TokenType.OR:
+                return left if self.isTruthy(left.value) else right
+            else:
+                return right if self.isTruthy(left.value) else left
+
+        return Logical(left, expr.operator, right)
+
+    def visitCallExpr(self, expr):
+        return Call(expr.callee.accept(self), expr.paren,
+                    [argument.accept(self) for argument in expr.arguments])
@@ -0,0 +1,52 @@
+class Output:
+    # Where print statements write. Lines are collected and handed to the
+    # stream in one write once `size` characters are pending, instead of one
+    # print() call each. With line buffering, the default when the stream is
+    # a terminal, every line is written and flushed as it is printed. The
+    # owner flushes before reporting a runtime error and when a run ends.
+    def __init__(self, stream, lineBuffered=None, size=1 << 16):
+        if lineBuffered is None:
+            isatty = getattr(stream, "isatty", None)
+            lineBuffered = isatty is not None and isatty()
+        self.stream = stream
+        self.lineBuffered = lineBuffered
+        self.size = size
+        self.lines = []
+        self.pending = 0
+        if lineBuffered:
+            self.write = self.writeLine
+
+    def write(self, text):
+        self.lines.append(text)
+        self.pending += len(text) + 1
+        if self.pending >= self.size:
+            self.flush()
+
+    def writeLine(self, text):
+        self.stream.write(text + "\n")
+        self.stream.flush()
+
+    def flush(self):
+        lines = self.lines
+        if lines:
+            lines.append("")
+            self.stream.write("\n".join(lines))
+            self.lines = []
+            self.pending = 0
+        self.stream.flush()
+
+
+# Text of integral numbers already printed. Zero is never stored, since
+# -0.0 == 0.0 but prints as "-0".
+numberTexts = {}
+
+
+def formatNumber(value):
+    text = numberTexts.get(value)
+    if text is None:
+        text = repr(value)
+        if text[-2:] == ".0":
+            text = text[:-2]
+            if value and len(numberTexts) < 4096:
+                numberTexts[value] = text
+    return text
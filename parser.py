@@ -4,78 +4,135 @@ from stmt import *
 from error import LoxParseError
 
 
+class Precedence:
+    NONE = 0
+    ASSIGNMENT = 1
+    OR = 2
+    AND = 3
+    EQUALITY = 4
+    COMPARISON = 5
+    TERM = 6
+    FACTOR = 7
+    UNARY = 8
+    CALL = 9
+
+
 class Parser:
+    infixRules = {
+        TokenType.EQUAL: Precedence.ASSIGNMENT,
+        TokenType.OR: Precedence.OR,
+        TokenType.AND: Precedence.AND,
+        TokenType.BANG_EQUAL: Precedence.EQUALITY,
+        TokenType.EQUAL_EQUAL: Precedence.EQUALITY,
+        TokenType.GREATER: Precedence.COMPARISON,
+        TokenType.GREATER_EQUAL: Precedence.COMPARISON,
+        TokenType.LESS: Precedence.COMPARISON,
+        TokenType.LESS_EQUAL: Precedence.COMPARISON,
+        TokenType.MINUS: Precedence.TERM,
+        TokenType.PLUS: Precedence.TERM,
+        TokenType.SLASH: Precedence.FACTOR,
+        TokenType.STAR: Precedence.FACTOR,
+        TokenType.LEFT_PAREN: Precedence.CALL,
+    }
+
+    # The same table indexed by type code, so the loop in parsePrecedence
+    # never hashes an enum member.
+    infixPrecedence = [Precedence.NONE] * (len(TokenType.members) + 1)
+    for type, precedence in infixRules.items():
+        infixPrecedence[type.value] = precedence
+    del type, precedence
+
+    EQUAL = TokenType.EQUAL.value
+    OR = TokenType.OR.value
+    AND = TokenType.AND.value
+    LEFT_PAREN = TokenType.LEFT_PAREN.value
+    FALSE = TokenType.FALSE.value
+    TRUE = TokenType.TRUE.value
+    NIL = TokenType.NIL.value
+    NUMBER = TokenType.NUMBER.value
+    STRING = TokenType.STRING.value
+    IDENTIFIER = TokenType.IDENTIFIER.value
+    BANG = TokenType.BANG.value
+    MINUS = TokenType.MINUS.value
+
     def __init__(self, tokens, lox):
-        self.tokens = tokens
+        # Tokens may come from a list or straight from a scanner's stream;
+        # only the current and previous token are ever kept.
+        self.tokens = iter(tokens)
         self.lox = lox
-        self.current = 0
+        self.currentToken = next(self.tokens)
+        self.previousToken = None
 
     def expression(self):
-        return self.assignment()
+        return self.parsePrecedence(Precedence.ASSIGNMENT)
 
-    def equality(self):
-        expr = self.comparison()
+    def peekCode(self):
+        return self.currentToken.type._value_
 
-        while self.match(TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL):
-            operator = self.previous()
-            right = self.comparison()
-            expr = Binary(expr, operator, right)
+    def peekLine(self):
+        return self.currentToken.line
 
-        return expr
-
-    def comparison(self):
-        expr = self.term()
-
-        while self.match(TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL):
-            operator = self.previous()
-            right = self.term()
-            expr = Binary(expr, operator, right)
+    def parsePrecedence(self, precedence):
+        expr = self.prefix()
 
-        return expr
+        infixPrecedence = self.infixPrecedence
+        code = self.peekCode()
+        while precedence <= infixPrecedence[code]:
+            self.advance()
 
-    def term(self):
-        expr = self.factor()
+            # The operator's token is only fetched where it is kept.
+            if code == self.LEFT_PAREN:
+                expr = self.finishCall(expr)
+            elif code == self.EQUAL:
+                # Assignment is right-associative. An invalid target is
+                # reported without throwing, and the target is kept.
+                operator = self.previous()
+                value = self.parsePrecedence(Precedence.ASSIGNMENT)
+                if isinstance(expr, Variable):
+                    expr = Assign(expr.name, value)
+                else:
+                    self.lox.error2(operator, "Invalid assignment target.")
+            elif code == self.OR or code == self.AND:
+                operator = self.previous()
+                right = self.parsePrecedence(infixPrecedence[code] + 1)
+                expr = Logical(expr, operator, right)
+            else:
+                operator = self.previous()
+                right = self.parsePrecedence(infixPrecedence[code] + 1)
+                expr = Binary(expr, operator, right)
 
-        while self.match(TokenType.MINUS, TokenType.PLUS):
-            operator = self.previous()
-            right = self.factor()
-            expr = Binary(expr, operator, right)
+            code = self.peekCode()
 
         return expr
 
-    def factor(self):
-        expr = self.unary()
-
-        while self.match(TokenType.SLASH, TokenType.STAR):
-            operator = self.previous()
-            right = self.unary()
-            expr = Binary(expr, operator, right)
-
-        return expr
+    def prefix(self):
+        code = self.peekCode()
 
-    def unary(self):
-        if self.match(TokenType.BANG, TokenType.MINUS):
+        if code == self.NUMBER or code == self.STRING:
+            self.advance()
+            return Literal(self.previous().literal)
+        elif code == self.IDENTIFIER:
+            self.advance()
+            return Variable(self.previous())
+        elif code == self.LEFT_PAREN:
+            self.advance()
+            expr = self.expression()
+            self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
+            return Grouping(expr)
+        elif code == self.BANG or code == self.MINUS:
+            self.advance()
             operator = self.previous()
-            right = self.unary()
+            right = self.parsePrecedence(Precedence.UNARY)
             return Unary(operator, right)
-        else:
-            return self.call()
-
-    def primary(self):
-        if self.match(TokenType.FALSE):
+        elif code == self.FALSE:
+            self.advance()
             return Literal(False)
-        elif self.match(TokenType.TRUE):
+        elif code == self.TRUE:
+            self.advance()
             return Literal(True)
-        elif self.match(TokenType.NIL):
+        elif code == self.NIL:
+            self.advance()
             return Literal(None)
-        elif self.match(TokenType.NUMBER, TokenType.STRING):
-            return Literal(self.previous().literal)
-        elif self.match(TokenType.LEFT_PAREN):
-            expr = self.expression()
-            self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
-            return Grouping(expr)
-        elif self.match(TokenType.IDENTIFIER):
-            return Variable(self.previous())
 
         raise self.error(self.peek(), "Expect expression.")
 
@@ -95,17 +152,18 @@ class Parser:
 
     def advance(self):
         if not self.isAtEnd():
-            self.current += 1
-        return self.previous()
+            self.previousToken = self.currentToken
+            self.currentToken = next(self.tokens)
+        return self.previousToken
 
     def isAtEnd(self):
         return self.peek().type == TokenType.EOF
 
     def peek(self):
-        return self.tokens[self.current]
+        return self.currentToken
 
     def previous(self):
-        return self.tokens[self.current - 1]
+        return self.previousToken
 
     def consume(self, type, message):
         if self.check(type):
@@ -114,7 +172,7 @@ class Parser:
             raise self.error(self.peek(), message)
 
     def error(self, token, message):
-        self.lox.error(token, message)
+        self.lox.error2(token, message)
         return LoxParseError(token, message)
 
     def synchronize(self):
@@ -144,41 +202,59 @@ class Parser:
             self.advance()
 
     def parse(self):
-        statements = []
+        return list(self.declarations())
+
+    def declarations(self):
         while not self.isAtEnd():
-            statements.append(self.declaration())
-        return statements
+            yield self.declaration()
     # try:
     # 	return self.expression()
     # except LoxParseError:
     # 	return None
 
     def statement(self):
+        # Every statement records the line it starts on, for tools that
+        # report per line (the profiler, coverage).
+        line = self.peekLine()
         if self.match(TokenType.PRINT):
-            return self.printStatement()
+            stmt = self.printStatement()
         elif self.match(TokenType.LEFT_BRACE):
-            return Block(self.block())
+            stmt = Block(self.block())
         elif self.match(TokenType.IF):
-            return self.ifStatement()
+            stmt = self.ifStatement()
         elif self.match(TokenType.WHILE):
-            return self.whileStatement()
+            stmt = self.whileStatement()
         elif self.match(TokenType.FOR):
-            return self.forStatement()
+            return self.forStatement(line)
+        elif self.match(TokenType.RETURN):
+            stmt = self.returnStatement()
         else:
-            return self.expressionStatement()
+            stmt = self.expressionStatement()
+        stmt.line = line
+        return stmt
 
     def printStatement(self):
         value = self.expression()
         self.consume(TokenType.SEMICOLON, "Expect ';' after value.")
         return Print(value)
 
+    def returnStatement(self):
+        keyword = self.previous()
+        value = None
+        if not self.check(TokenType.SEMICOLON):
+            value = self.expression()
+
+        self.consume(TokenType.SEMICOLON, "Expect ';' after return value.")
+        return Return(keyword, value)
+
     def expressionStatement(self):
         expr = self.expression()
         self.consume(TokenType.SEMICOLON, "Expect ';' after value.")
         return Expression(expr)
 
     def varDeclaration(self):
-        name = self.consume(TokenType.IDENTIFIER, "Expect variable name.")
+        self.consume(TokenType.IDENTIFIER, "Expect variable name.")
+        name = self.previous()
 
         initializer = None
         if self.match(TokenType.EQUAL):
@@ -187,11 +263,40 @@ class Parser:
         self.consume(TokenType.SEMICOLON,
                      "Expect ';' after variable declaration.")
 
-        return Var(name, initializer)
+        stmt = Var(name, initializer)
+        stmt.line = name.line
+        return stmt
+
+    def function(self, kind):
+        self.consume(TokenType.IDENTIFIER, "Expect " + kind + " name.")
+        name = self.previous()
+        self.consume(TokenType.LEFT_PAREN,
+                     "Expect '(' after " + kind + " name.")
+        parameters = []
+        if not self.check(TokenType.RIGHT_PAREN):
+            while True:
+                if len(parameters) >= 255:
+                    self.error(self.peek(),
+                               "Can't have more than 255 parameters.")
+                self.consume(TokenType.IDENTIFIER, "Expect parameter name.")
+                parameters.append(self.previous())
+
+                if not self.match(TokenType.COMMA):
+                    break
+
+        self.consume(TokenType.RIGHT_PAREN, "Expect ')' after parameters.")
+        self.consume(TokenType.LEFT_BRACE,
+                     "Expect '{' before " + kind + " body.")
+        body = self.block()
+        stmt = Function(name, parameters, body)
+        stmt.line = name.line
+        return stmt
 
     def declaration(self):
         try:
-            if self.match(TokenType.VAR):
+            if self.match(TokenType.FUN):
+                return self.function("function")
+            elif self.match(TokenType.VAR):
                 return self.varDeclaration()
             else:
                 return self.statement()
@@ -199,21 +304,6 @@ class Parser:
             self.synchronize()
             return None
 
-    def assignment(self):
-        expr = self.or_expr()
-
-        if self.match(TokenType.EQUAL):
-            equals = self.previous()
-            value = self.assignment()
-
-            if isinstance(expr, Variable):
-                name = expr.name
-                return Assign(name, value)
-
-            self.lox.error2(equals, "Invalid assignment target.")
-
-        return expr
-
     def block(self):
         statements = []
 
@@ -235,26 +325,6 @@ class Parser:
 
         return If(condition, thenBrach, elseBranch)
 
-    def or_expr(self):
-        expr = self.and_expr()
-
-        while self.match(TokenType.OR):
-            operator = self.previous()
-            right = self.and_expr()
-            expr = Logical(expr, operator, right)
-
-        return expr
-
-    def and_expr(self):
-        expr = self.equality()
-
-        while self.match(TokenType.AND):
-            operator = self.previous()
-            right = self.equality()
-            expr = Logical(expr, operator, right)
-
-        return expr
-
     def whileStatement(self):
         self.consume(TokenType.LEFT_PAREN, "Expect '(' after 'while'.")
         condition = self.expression()
@@ -263,7 +333,7 @@ class Parser:
 
         return While(condition, body)
 
-    def forStatement(self):
+    def forStatement(self, line):
         self.consume(TokenType.LEFT_PAREN, "Expect '(' after 'for'.")
 
         initializer = None
@@ -273,6 +343,7 @@ class Parser:
             initializer = self.varDeclaration()
         else:
             initializer = self.expressionStatement()
+            initializer.line = line
 
         condition = None
         if not self.check(TokenType.SEMICOLON):
@@ -281,6 +352,7 @@ class Parser:
         self.consume(TokenType.SEMICOLON, "Expect ';' after loop condition.")
 
         increment = None
+        incrementLine = self.peekLine()
         if not self.check(TokenType.RIGHT_PAREN):
             increment = self.expression()
 
@@ -288,96 +360,90 @@ class Parser:
         body = self.statement()
 
         if increment is not None:
-            body = Block([body, Expression(increment)])
+            increment = Expression(increment)
+            increment.line = incrementLine
 
         if condition is None:
             condition = Literal(True)
 
-        body = While(condition, body)
-
-        if initializer is not None:
-            body = Block([initializer, body])
-
-        return body
+        loop = For(initializer, condition, increment, body)
+        loop.line = line
+        return loop
 
-    def call(self):
-        expr = self.primary()
-        
-        while True:
-            if self.match(TokenType.LEFT_PAREN):
-                expr = self.finishCall(expr)
-            else:
-                break;
-        
-        return expr;
-    
     def finishCall(self, callee):
-        arguments = {}
+        arguments = []
         if not self.check(TokenType.RIGHT_PAREN):
             while True:
                 if len(arguments) >= 255:
                     self.error(self.peek(), "Can't have more than 255 arguments.")
-                arguments.add(self.expression())
-                
+                arguments.append(self.expression())
+
                 if not self.match(TokenType.COMMA):
                     break
-        
-        paren = self.consume(TokenType.RIGHT_PAREN, "Expect ')' after arguments.")
-        
-        return Call(callee, paren, arguments)
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
 
+        self.consume(TokenType.RIGHT_PAREN, "Expect ')' after arguments.")
+        paren = self.previous()
 
+        return Call(callee, paren, arguments)
 
 
+class BufferParser(Parser):
+    # Parses straight from a TokenBuffer: checks compare type codes and a
+    # Token object is only built when the grammar keeps or reports one.
+    def __init__(self, buffer, lox):
+        self.buffer = buffer
+        self.types = buffer.types
+        self.lox = lox
+        self.current = 0
+        self.eof = TokenType.EOF.value
 
+    def match(self, *types):
+        code = self.types[self.current]
+        if code == self.eof:
+            return False
 
+        for type in types:
+            if code == type._value_:
+                self.current += 1
+                return True
 
+        return False
 
+    def check(self, type):
+        code = self.types[self.current]
+        return code != self.eof and code == type._value_
 
+    def advance(self):
+        if self.types[self.current] != self.eof:
+            self.current += 1
 
+    def consume(self, type, message):
+        # Unlike Parser.consume, returns nothing: callers that keep the
+        # token ask previous() for it.
+        if self.check(type):
+            self.current += 1
+        else:
+            raise self.error(self.peek(), message)
 
+    def isAtEnd(self):
+        return self.types[self.current] == self.eof
 
+    def peekCode(self):
+        return self.types[self.current]
 
+    def peekLine(self):
+        return self.buffer.lines[self.current]
 
+    def peek(self):
+        return self.buffer.token(self.current)
 
+    def previous(self):
+        return self.buffer.token(self.current - 1)
 
+    def prefix(self):
+        # Literals are read straight from the buffer without a Token.
+        code = self.types[self.current]
+        if code == self.NUMBER or code == self.STRING:
+            self.current += 1
+            return Literal(self.buffer.literal(self.current - 1))
+        return super().prefix()
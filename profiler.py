@@ -0,0 +1,83 @@
+import signal
+
+from interpreter import Interpreter
+
+
+class Profiler:
+    # Samples the tree interpreter on a CPU-time timer. On each tick the
+    # signal handler walks the interrupted Python stack and picks out the
+    # Interpreter.execute frames; the statements they are running, outermost
+    # first, are the Lox stack for that sample. Nothing is recorded between
+    # ticks, so the interpreter itself runs unchanged.
+    execute = Interpreter.execute.__code__
+
+    def __init__(self, interval=0.001):
+        self.interval = interval
+        self.stacks = {}
+        self.samples = 0
+        self.previous = None
+
+    def start(self):
+        self.previous = signal.signal(signal.SIGPROF, self.sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self):
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self.previous)
+
+    def sample(self, signum, frame):
+        # A statement nested in another on the same line (a for loop's
+        # desugared blocks, an else-if chain) adds no frame of its own.
+        execute = self.execute
+        lines = []
+        while frame is not None:
+            if frame.f_code is execute:
+                line = frame.f_locals["stmt"].line
+                if not lines or lines[-1] != line:
+                    lines.append(line)
+            frame = frame.f_back
+        stack = tuple(reversed(lines))
+        self.stacks[stack] = self.stacks.get(stack, 0) + 1
+        self.samples += 1
+
+    def lineCounts(self):
+        # Self samples count the innermost line only; total samples count
+        # every line on the stack once.
+        selfCounts = {}
+        totalCounts = {}
+        for stack, count in self.stacks.items():
+            if stack:
+                selfCounts[stack[-1]] = selfCounts.get(stack[-1], 0) + count
+            for line in set(stack):
+                totalCounts[line] = totalCounts.get(line, 0) + count
+        return selfCounts, totalCounts
+
+    def report(self, file, source=None, limit=20):
+        print("%d samples, %.1f ms interval" %
+              (self.samples, self.interval * 1000), file=file)
+        if self.samples == 0:
+            return
+
+        lines = source.split("\n") if source is not None else []
+        selfCounts, totalCounts = self.lineCounts()
+        print("%6s %7s %7s  %s" % ("line", "self", "total", "source"),
+              file=file)
+        hottest = sorted(selfCounts, key=lambda line: (-selfCounts[line],
+                                                       line))
+        for line in hottest[:limit]:
+            text = lines[line - 1].strip() if 0 < line <= len(lines) else ""
+            print("%6d %6.1f%% %6.1f%%  %s" %
+                  (line, 100.0 * selfCounts[line] / self.samples,
+                   100.0 * totalCounts[line] / self.samples, text[:60]),
+                  file=file)
+
+    def writeCollapsed(self, path, name):
+        # One "frame;frame;... count" line per distinct stack, the input
+        # format of flamegraph.pl and speedscope. Samples taken outside any
+        # statement (scanning, parsing, resolving) are attributed to the
+        # script itself.
+        file = open(path, "w")
+        for stack, count in sorted(self.stacks.items()):
+            frames = [name] + [name + ":" + str(line) for line in stack]
+            file.write(";".join(frames) + " " + str(count) + "\n")
+        file.close()
@@ -0,0 +1,226 @@
+import gc
+import marshal
+import os
+import sys
+
+from expr import Expr
+from stmt import Stmt
+from tokenType import TokenType
+from loxToken import Token
+
+
+class Codec:
+    # A resolved statement list is flattened into nested tuples that marshal
+    # can write. A node is (class code, fields...), a token is (-1 - type
+    # code, lexeme, literal, line) and a list of nodes stays a list. Handler
+    # slots are dropped; the interpreter fills them in again on first use.
+    classes = Expr.__subclasses__() + Stmt.__subclasses__()
+    tokenTypes = {type.value: type for type in TokenType.members}
+
+    def __init__(self):
+        # One generated encoder and decoder per node class, so converting a
+        # node is a single call that reads or assigns its slots directly.
+        self.encoders = {}
+        self.decoders = []
+        for code, type in enumerate(self.classes):
+            fields = [name for name in type.__slots__ if name != "handler"]
+            namespace = {"new": object.__new__, "type": type,
+                         "encode": self.encode, "decode": self.decode}
+
+            lines = ["def encoder(node):",
+                     "    return (%d, %s)" % (code, ", ".join(
+                         "encode(node.%s)" % name for name in fields))]
+            lines.append("def decoder(fields):")
+            lines.append("    node = new(type)")
+            for index, name in enumerate(fields):
+                lines.append("    node.%s = decode(fields[%d])" %
+                             (name, index + 1))
+            if "handler" in type.__slots__:
+                lines.append("    node.handler = None")
+            lines.append("    return node")
+
+            exec("\n".join(lines), namespace)
+            self.encoders[type] = namespace["encoder"]
+            self.decoders.append(namespace["decoder"])
+
+    def encode(self, value):
+        encoder = self.encoders.get(type(value))
+        if encoder is not None:
+            return encoder(value)
+        elif type(value) is list:
+            return [self.encode(item) for item in value]
+        elif type(value) is Token:
+            return (-1 - value.type._value_, value.lexeme, value.literal,
+                    value.line)
+        return value
+
+    def decode(self, value):
+        if type(value) is tuple:
+            code = value[0]
+            if code < 0:
+                return Token(self.tokenTypes[-1 - code], value[1], value[2],
+                             value[3])
+            return self.decoders[code](value)
+        elif type(value) is list:
+            return [self.decode(item) for item in value]
+        return value
+
+    def dumps(self, statements):
+        return self.withoutCollector(
+            lambda: marshal.dumps(self.encode(statements)))
+
+    def loads(self, data):
+        return self.withoutCollector(
+            lambda: self.decode(marshal.loads(data)))
+
+    def withoutCollector(self, convert):
+        # Both directions allocate one container per node and token and free
+        # none of them, which only makes the cyclic collector rescan them.
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return convert()
+        finally:
+            if enabled:
+                gc.enable()
+
+
+class ProgramCache:
+    # Resolved statement lists are stored under a key made from the script
+    # source, the -O flag, the Python version and the source of every
+    # front-end module, so editing any of them invalidates the entry. The
+    # directory is trimmed back to maxSize bytes, least recently used first;
+    # a load touches the entry's mtime.
+    frontEnd = ("tokenType.py", "loxToken.py", "tokenBuffer.py",
+                "regexScanner.py", "parser.py", "expr.py", "stmt.py",
+                "optimizer.py", "resolver.py", "purity.py", "natives.py",
+                "programCache.py")
+    suffix = ".loxc"
+    defaultMaxSize = 64 * 1024 * 1024
+    versionHash = None
+
+    def __init__(self, directory=None, maxSize=None):
+        if directory is None:
+            directory = os.environ.get("LOX_CACHE_DIR")
+        if directory is None:
+            directory = os.path.join(
+                os.environ.get("XDG_CACHE_HOME") or
+                os.path.join(os.path.expanduser("~"), ".cache"), "lox")
+        if maxSize is None:
+            maxSize = int(os.environ.get("LOX_CACHE_SIZE",
+                                         self.defaultMaxSize))
+        self.directory = directory
+        self.maxSize = maxSize
+        self.codec = None
+
+    @classmethod
+    def version(cls):
+        import hashlib
+
+        if cls.versionHash is None:
+            digest = hashlib.sha256(sys.version.encode())
+            here = os.path.dirname(os.path.abspath(__file__))
+            for name in cls.frontEnd:
+                file = open(os.path.join(here, name), "rb")
+                digest.update(file.read())
+                file.close()
+            cls.versionHash = digest.digest()
+        return cls.versionHash
+
+    def key(self, source, optimize):
+        # hashlib loads OpenSSL, so it is only imported once a key is needed.
+        import hashlib
+
+        digest = hashlib.sha256(self.version())
+        digest.update(b"O" if optimize else b"-")
+        digest.update(source.encode("utf-8", "surrogatepass"))
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def getCodec(self):
+        if self.codec is None:
+            self.codec = Codec()
+        return self.codec
+
+    def load(self, key):
+        path = self.path(key)
+        try:
+            file = open(path, "rb")
+            data = file.read()
+            file.close()
+        except OSError:
+            return None
+
+        try:
+            statements = self.getCodec().loads(data)
+        except Exception:
+            # Truncated or otherwise unreadable; compile from source instead.
+            self.discard(path)
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return statements
+
+    def store(self, key, statements):
+        try:
+            data = self.getCodec().dumps(statements)
+        except (RecursionError, ValueError):
+            return False
+
+        path = self.path(key)
+        temporary = path + "." + str(os.getpid())
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            file = open(temporary, "wb")
+            file.write(data)
+            file.close()
+            os.replace(temporary, path)
+        except OSError:
+            self.discard(temporary)
+            return False
+
+        self.evict()
+        return True
+
+    def evict(self):
+        entries = []
+        total = 0
+        try:
+            with os.scandir(self.directory) as iterator:
+                for entry in iterator:
+                    if entry.name.endswith(self.suffix):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size,
+                                        entry.path))
+                        total += stat.st_size
+        except OSError:
+            return
+
+        if total <= self.maxSize:
+            return
+        entries.sort()
+        for mtime, size, path in entries:
+            if total <= self.maxSize:
+                break
+            self.discard(path)
+            total -= size
+
+    def clear(self):
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if name.endswith(self.suffix):
+                self.discard(os.path.join(self.directory, name))
+
+    def discard(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
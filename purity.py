@@ -0,0 +1,195 @@
+from expr import Variable
+from stmt import Function
+from natives import pureNatives
+
+
+class Facts:
+    # What one function declaration does that bears on its purity: whether
+    # its own body is impure, and the functions it refers to, by declaration
+    # for locals and by name for globals, which are only settled once the
+    # whole program has been seen.
+    __slots__ = ("declaration", "base", "impure", "dependencies")
+
+    def __init__(self, declaration, base):
+        self.declaration = declaration
+        self.base = base
+        self.impure = False
+        self.dependencies = []
+
+
+class Purity:
+    # Marks the function declarations whose result depends on nothing but
+    # their arguments, so that the interpreter can memoize them. A pure
+    # function does not print, assign or read any variable outside its own
+    # body, declare functions (each call would return a fresh closure) or
+    # call anything but pure functions and pure natives, and every function
+    # it refers to is bound to a name that is never reassigned or
+    # redeclared. The analysis needs the whole program, so it runs on
+    # compiled files only; the REPL and --stream rely on memoize().
+    def __init__(self):
+        self.scopes = []
+        self.globals = {}
+        self.assigned = set()
+        self.assignedGlobals = set()
+        self.function = None
+        self.facts = []
+
+    def analyze(self, statements):
+        for statement in statements:
+            statement.accept(self)
+
+        pure = {facts.declaration: facts for facts in self.facts
+                if not facts.impure}
+        changed = True
+        while changed:
+            changed = False
+            for declaration, facts in list(pure.items()):
+                for dependency in facts.dependencies:
+                    if not self.isPure(dependency, pure):
+                        del pure[declaration]
+                        changed = True
+                        break
+
+        for declaration in pure:
+            declaration.pure = True
+
+    def isPure(self, dependency, pure):
+        if type(dependency) is str:
+            declarations = self.globals.get(dependency)
+            if declarations is None:
+                return dependency in pureNatives
+            if (len(declarations) != 1 or
+                    dependency in self.assignedGlobals):
+                return False
+            dependency = declarations[0]
+        elif dependency in self.assigned:
+            return False
+        return dependency in pure
+
+    def declare(self, name, declaration):
+        if self.scopes:
+            self.scopes[-1][name.lexeme] = declaration
+        else:
+            self.globals.setdefault(name.lexeme, []).append(declaration)
+
+    def lookup(self, name):
+        # The index of the scope holding the name, -1 for a global.
+        for index in range(len(self.scopes) - 1, -1, -1):
+            declaration = self.scopes[index].get(name.lexeme)
+            if declaration is not None:
+                return index, declaration
+        return -1, None
+
+    def impure(self):
+        if self.function is not None:
+            self.function.impure = True
+
+    def visitBlockStmt(self, stmt):
+        self.scopes.append({})
+        for statement in stmt.statements:
+            statement.accept(self)
+        self.scopes.pop()
+
+    def visitExpressionStmt(self, stmt):
+        stmt.expression.accept(self)
+
+    def visitFunctionStmt(self, stmt):
+        self.impure()
+        self.declare(stmt.name, stmt)
+
+        facts = Facts(stmt, len(self.scopes))
+        self.facts.append(facts)
+        enclosing = self.function
+        self.function = facts
+        self.scopes.append({param.lexeme: param for param in stmt.params})
+        for statement in stmt.body:
+            statement.accept(self)
+        self.scopes.pop()
+        self.function = enclosing
+
+    def visitIfStmt(self, stmt):
+        stmt.condition.accept(self)
+        stmt.thenBranch.accept(self)
+        if stmt.elseBranch is not None:
+            stmt.elseBranch.accept(self)
+
+    def visitPrintStmt(self, stmt):
+        self.impure()
+        stmt.expression.accept(self)
+
+    def visitReturnStmt(self, stmt):
+        if stmt.value is not None:
+            stmt.value.accept(self)
+
+    def visitVarStmt(self, stmt):
+        if stmt.initializer is not None:
+            stmt.initializer.accept(self)
+        self.declare(stmt.name, stmt)
+
+    def visitWhileStmt(self, stmt):
+        stmt.condition.accept(self)
+        stmt.body.accept(self)
+
+    def visitForStmt(self, stmt):
+        self.scopes.append({})
+        if stmt.initializer is not None:
+            stmt.initializer.accept(self)
+        stmt.condition.accept(self)
+        stmt.body.accept(self)
+        if stmt.increment is not None:
+            stmt.increment.accept(self)
+        self.scopes.pop()
+
+    def visitAssignExpr(self, expr):
+        expr.value.accept(self)
+        index, declaration = self.lookup(expr.name)
+        if index < 0:
+            self.assignedGlobals.add(expr.name.lexeme)
+        else:
+            self.assigned.add(declaration)
+        if self.function is not None and index < self.function.base:
+            self.function.impure = True
+
+    def visitBinaryExpr(self, expr):
+        expr.left.accept(self)
+        expr.right.accept(self)
+
+    def visitCallExpr(self, expr):
+        # Only calls to a function named from outside the body can be
+        # followed; anything else calls a value the analysis cannot see.
+        callee = expr.callee
+        if type(callee) is not Variable:
+            self.impure()
+        elif (self.function is not None and
+              self.lookup(callee.name)[0] >= self.function.base):
+            self.function.impure = True
+        callee.accept(self)
+        for argument in expr.arguments:
+            argument.accept(self)
+
+    def visitGroupingExpr(self, expr):
+        expr.expression.accept(self)
+
+    def visitLiteralExpr(self, expr):
+        pass
+
+    def visitLogicalExpr(self, expr):
+        expr.left.accept(self)
+        expr.right.accept(self)
+
+    def visitUnaryExpr(self, expr):
+        expr.right.accept(self)
+
+    def visitVariableExpr(self, expr):
+        function = self.function
+        if function is None:
+            return
+        index, declaration = self.lookup(expr.name)
+        if index >= function.base:
+            return
+        if index < 0:
+            function.dependencies.append(expr.name.lexeme)
+        elif type(declaration) is Function:
+            function.dependencies.append(declaration)
+        else:
+            function.impure = True
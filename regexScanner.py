@@ -0,0 +1,208 @@
+import re
+
+from tokenType import TokenType
+from loxToken import Token
+from tokenBuffer import TokenBuffer
+
+
+class RegexScanner:
+    # Leading blanks are folded into every alternative so that they never
+    # cost a match of their own; trailing blanks simply match nothing.
+    pattern = re.compile(r"""
+        [ \t\r]*
+    (?:
+        (?P<newline>\n+)
+      | (?P<comment>//[^\n]*)
+      | (?P<number>[0-9]+(?:\.[0-9]+)?)
+      | (?P<identifier>[A-Za-z_][A-Za-z_0-9]*)
+      | (?P<string>"[^"]*")
+      | (?P<unterminated>"[^"]*)
+      | (?P<operator>[!=<>]=?|[(){},.\-+;*/])
+      | (?P<unexpected>[^ \t\r])
+    )
+    """, re.VERBOSE | re.DOTALL)
+
+    # Group numbers in the order they appear in the pattern above.
+    NEWLINE = 1
+    COMMENT = 2
+    NUMBER = 3
+    IDENTIFIER = 4
+    STRING = 5
+    UNTERMINATED = 6
+    OPERATOR = 7
+    UNEXPECTED = 8
+
+    keywords = {
+        "and": TokenType.AND,
+        "class": TokenType.CLASS,
+        "else": TokenType.ELSE,
+        "false": TokenType.FALSE,
+        "for": TokenType.FOR,
+        "fun": TokenType.FUN,
+        "if": TokenType.IF,
+        "nil": TokenType.NIL,
+        "or": TokenType.OR,
+        "print": TokenType.PRINT,
+        "return": TokenType.RETURN,
+        "super": TokenType.SUPER,
+        "this": TokenType.THIS,
+        "true": TokenType.TRUE,
+        "var": TokenType.VAR,
+        "while": TokenType.WHILE,
+    }
+
+    operators = {
+        "(": TokenType.LEFT_PAREN,
+        ")": TokenType.RIGHT_PAREN,
+        "{": TokenType.LEFT_BRACE,
+        "}": TokenType.RIGHT_BRACE,
+        ",": TokenType.COMMA,
+        ".": TokenType.DOT,
+        "-": TokenType.MINUS,
+        "+": TokenType.PLUS,
+        ";": TokenType.SEMICOLON,
+        "*": TokenType.STAR,
+        "/": TokenType.SLASH,
+        "!": TokenType.BANG,
+        "!=": TokenType.BANG_EQUAL,
+        "=": TokenType.EQUAL,
+        "==": TokenType.EQUAL_EQUAL,
+        "<": TokenType.LESS,
+        "<=": TokenType.LESS_EQUAL,
+        ">": TokenType.GREATER,
+        ">=": TokenType.GREATER_EQUAL,
+    }
+
+    keywordCodes = {text: type.value for text, type in keywords.items()}
+    operatorCodes = {text: type.value for text, type in operators.items()}
+
+    def __init__(self, source, interpreter):
+        self.source = source
+        self.interpreter = interpreter
+        self.tokens = []
+        self.line = 1
+
+    def scanTokens(self):
+        self.tokens.extend(self.tokenStream())
+        return self.tokens
+
+    def tokenStream(self):
+        keywords = self.keywords
+        operators = self.operators
+        identifierType = TokenType.IDENTIFIER
+        finditer = self.pattern.finditer
+        line = self.line
+
+        NEWLINE = self.NEWLINE
+        COMMENT = self.COMMENT
+        NUMBER = self.NUMBER
+        IDENTIFIER = self.IDENTIFIER
+        STRING = self.STRING
+        UNTERMINATED = self.UNTERMINATED
+        OPERATOR = self.OPERATOR
+
+        # The source is either one string or an iterable of lines, such as
+        # an open file. Only strings can span lines, so an unterminated one
+        # is carried over and rescanned once its closing quote has arrived.
+        if isinstance(self.source, str):
+            chunks = (self.source,)
+        else:
+            chunks = self.source
+
+        pending = ""
+        for chunk in chunks:
+            if pending:
+                if "\"" not in chunk:
+                    pending += chunk
+                    continue
+                chunk = pending + chunk
+                pending = ""
+
+            for match in finditer(chunk):
+                kind = match.lastindex
+                if kind == IDENTIFIER:
+                    text = match.group(kind)
+                    yield Token(keywords.get(text, identifierType), text, None,
+                                line)
+                elif kind == OPERATOR:
+                    text = match.group(kind)
+                    yield Token(operators[text], text, None, line)
+                elif kind == NEWLINE:
+                    line += match.end() - match.start(kind)
+                elif kind == NUMBER:
+                    text = match.group(kind)
+                    yield Token(TokenType.NUMBER, text, float(text), line)
+                elif kind == STRING:
+                    text = match.group(kind)
+                    line += text.count("\n")
+                    yield Token(TokenType.STRING, text, text[1:-1], line)
+                elif kind == COMMENT:
+                    pass
+                elif kind == UNTERMINATED:
+                    pending = match.group(kind)
+                else:
+                    self.interpreter.error(line, "Unexpected character.")
+
+        if pending:
+            line += pending.count("\n")
+            self.interpreter.error(line, "Unterminated string.")
+
+        self.line = line
+        yield Token(TokenType.EOF, "", None, line)
+
+    def scanBuffer(self):
+        # Same rules as tokenStream, but only the type code, offset, length
+        # and line of each token are recorded; lexemes stay in the source.
+        buffer = TokenBuffer(self.source)
+        types = buffer.types
+        starts = buffer.starts
+        lengths = buffer.lengths
+        lines = buffer.lines
+        keywordCodes = self.keywordCodes
+        operatorCodes = self.operatorCodes
+        identifierCode = TokenType.IDENTIFIER.value
+        numberCode = TokenType.NUMBER.value
+        stringCode = TokenType.STRING.value
+        line = self.line
+
+        NEWLINE = self.NEWLINE
+        COMMENT = self.COMMENT
+        NUMBER = self.NUMBER
+        IDENTIFIER = self.IDENTIFIER
+        STRING = self.STRING
+        UNTERMINATED = self.UNTERMINATED
+        OPERATOR = self.OPERATOR
+
+        for match in self.pattern.finditer(self.source):
+            kind = match.lastindex
+            if kind == IDENTIFIER:
+                types.append(keywordCodes.get(match.group(kind),
+                                              identifierCode))
+            elif kind == OPERATOR:
+                types.append(operatorCodes[match.group(kind)])
+            elif kind == NEWLINE:
+                line += match.end() - match.start(kind)
+                continue
+            elif kind == NUMBER:
+                types.append(numberCode)
+            elif kind == STRING:
+                line += match.group(kind).count("\n")
+                types.append(stringCode)
+            elif kind == COMMENT:
+                continue
+            elif kind == UNTERMINATED:
+                line += match.group(kind).count("\n")
+                self.interpreter.error(line, "Unterminated string.")
+                continue
+            else:
+                self.interpreter.error(line, "Unexpected character.")
+                continue
+
+            start = match.start(kind)
+            starts.append(start)
+            lengths.append(match.end(kind) - start)
+            lines.append(line)
+
+        self.line = line
+        buffer.append(TokenType.EOF.value, len(self.source), 0, line)
+        return buffer
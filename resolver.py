@@ -0,0 +1,210 @@
+from expr import Call
+from stmt import Var, Function
+
+
+class FunctionType:
+    NONE = 0
+    FUNCTION = 1
+
+
+class Resolver:
+    def __init__(self, lox):
+        self.lox = lox
+        self.scopes = []
+        self.currentFunction = FunctionType.NONE
+        self.functionCount = 0
+
+    def resolve(self, statements):
+        for statement in statements:
+            self.resolveStmt(statement)
+
+    def resolveStmt(self, stmt):
+        stmt.accept(self)
+
+    def resolveExpr(self, expr):
+        expr.accept(self)
+
+    def beginScope(self):
+        self.scopes.append({})
+
+    def endScope(self):
+        return len(self.scopes.pop())
+
+    def declare(self, name):
+        if len(self.scopes) == 0:
+            return None
+
+        scope = self.scopes[-1]
+        if name.lexeme in scope:
+            self.lox.error2(
+                name, "Already a variable with this name in this scope.")
+            return scope[name.lexeme][0]
+
+        slot = len(scope)
+        scope[name.lexeme] = (slot, False)
+        return slot
+
+    def define(self, name):
+        if len(self.scopes) == 0:
+            return
+
+        scope = self.scopes[-1]
+        scope[name.lexeme] = (scope[name.lexeme][0], True)
+
+    def resolveLocal(self, expr, name):
+        depth = 0
+        for scope in reversed(self.scopes):
+            if name.lexeme in scope:
+                expr.depth = depth
+                expr.slot = scope[name.lexeme][0]
+                return
+            depth += 1
+
+        expr.depth = None
+        expr.slot = None
+
+    def declaresVariables(self, statements):
+        for statement in statements:
+            if isinstance(statement, (Var, Function)):
+                return True
+        return False
+
+    def resolveFunction(self, function, type):
+        # Parameters and the body's own declarations share one scope, which
+        # becomes the call's environment; parameters take the first slots so
+        # the arguments list can be used as that environment's values.
+        enclosingFunction = self.currentFunction
+        self.currentFunction = type
+
+        self.beginScope()
+        for param in function.params:
+            self.declare(param)
+            self.define(param)
+        self.resolve(function.body)
+        function.size = self.endScope()
+
+        self.currentFunction = enclosingFunction
+
+    def visitBlockStmt(self, stmt):
+        # Blocks that declare nothing run in the enclosing environment, so
+        # they do not count towards the depth of the variables they use.
+        if not self.declaresVariables(stmt.statements):
+            stmt.size = 0
+            self.resolve(stmt.statements)
+            return None
+
+        self.beginScope()
+        self.resolve(stmt.statements)
+        stmt.size = self.endScope()
+        return None
+
+    def visitFunctionStmt(self, stmt):
+        self.functionCount += 1
+        stmt.slot = self.declare(stmt.name)
+        self.define(stmt.name)
+
+        self.resolveFunction(stmt, FunctionType.FUNCTION)
+        return None
+
+    def visitReturnStmt(self, stmt):
+        if self.currentFunction == FunctionType.NONE:
+            self.lox.error2(stmt.keyword, "Can't return from top-level code.")
+
+        if stmt.value is not None:
+            # The value of a return is in tail position: a call there is
+            # made by the enclosing call's loop instead of a new frame.
+            if type(stmt.value) is Call:
+                stmt.value.tail = True
+            self.resolveExpr(stmt.value)
+        return None
+
+    def visitVarStmt(self, stmt):
+        stmt.slot = self.declare(stmt.name)
+        if stmt.initializer is not None:
+            self.resolveExpr(stmt.initializer)
+        self.define(stmt.name)
+        return None
+
+    def visitVariableExpr(self, expr):
+        if len(self.scopes) != 0:
+            entry = self.scopes[-1].get(expr.name.lexeme)
+            if entry is not None and entry[1] is False:
+                self.lox.error2(
+                    expr.name, "Can't read local variable in its own initializer.")
+
+        self.resolveLocal(expr, expr.name)
+        return None
+
+    def visitAssignExpr(self, expr):
+        self.resolveExpr(expr.value)
+        self.resolveLocal(expr, expr.name)
+        return None
+
+    def visitExpressionStmt(self, stmt):
+        self.resolveExpr(stmt.expression)
+        return None
+
+    def visitPrintStmt(self, stmt):
+        self.resolveExpr(stmt.expression)
+        return None
+
+    def visitIfStmt(self, stmt):
+        self.resolveExpr(stmt.condition)
+        self.resolveStmt(stmt.thenBranch)
+        if stmt.elseBranch is not None:
+            self.resolveStmt(stmt.elseBranch)
+        return None
+
+    def visitWhileStmt(self, stmt):
+        self.resolveExpr(stmt.condition)
+        self.resolveStmt(stmt.body)
+        return None
+
+    def visitForStmt(self, stmt):
+        # A variable declared by the initializer gets a scope of its own,
+        # made once and shared by every iteration. The body's own block
+        # needs a fresh environment per iteration only if a function
+        # declared in it could capture that iteration's variables.
+        scoped = isinstance(stmt.initializer, Var)
+        if scoped:
+            self.beginScope()
+
+        if stmt.initializer is not None:
+            self.resolveStmt(stmt.initializer)
+        self.resolveExpr(stmt.condition)
+        functionCount = self.functionCount
+        self.resolveStmt(stmt.body)
+        stmt.fresh = self.functionCount != functionCount
+        if stmt.increment is not None:
+            self.resolveStmt(stmt.increment)
+
+        if scoped:
+            stmt.size = self.endScope()
+        return None
+
+    def visitBinaryExpr(self, expr):
+        self.resolveExpr(expr.left)
+        self.resolveExpr(expr.right)
+        return None
+
+    def visitCallExpr(self, expr):
+        self.resolveExpr(expr.callee)
+        for argument in expr.arguments:
+            self.resolveExpr(argument)
+        return None
+
+    def visitGroupingExpr(self, expr):
+        self.resolveExpr(expr.expression)
+        return None
+
+    def visitLiteralExpr(self, expr):
+        return None
+
+    def visitLogicalExpr(self, expr):
+        self.resolveExpr(expr.left)
+        self.resolveExpr(expr.right)
+        return None
+
+    def visitUnaryExpr(self, expr):
+        self.resolveExpr(expr.right)
+        return None
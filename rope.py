@@ -0,0 +1,64 @@
+class Rope:
+    # A Lox string built by concatenation, kept as the list of its pieces
+    # until something looks at its text. Appending shares the left operand's
+    # list: if nothing has been appended to that list past the left rope's
+    # own pieces, the new piece goes on the end in place, so building a
+    # string one piece at a time costs amortized O(1) per piece rather than
+    # a copy of everything so far. The text is joined once, on first use,
+    # and the rope then keeps only that text.
+    __slots__ = ("parts", "count", "length", "text")
+
+    # Shorter results are plain Python strings: copying them is cheaper
+    # than a rope.
+    threshold = 256
+
+    def __init__(self, parts, length):
+        self.parts = parts
+        self.count = len(parts)
+        self.length = length
+        self.text = None
+
+    def flatten(self):
+        text = self.text
+        if text is None:
+            parts = self.parts
+            if len(parts) != self.count:
+                parts = parts[:self.count]
+            text = self.text = "".join(parts)
+            self.parts = [text]
+            self.count = 1
+        return text
+
+    def __str__(self):
+        return self.flatten()
+
+    def __eq__(self, other):
+        if type(other) is Rope or type(other) is str:
+            return self.flatten() == str(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.flatten())
+
+
+strings = (str, Rope)
+
+
+def concat(left, right):
+    # Both operands are str or Rope.
+    if type(left) is str:
+        length = len(left)
+        if type(right) is str:
+            if length + len(right) < Rope.threshold:
+                return left + right
+            return Rope([left, right], length + len(right))
+        parts = [left]
+        parts += right.parts[:right.count]
+        return Rope(parts, length + right.length)
+
+    piece = right if type(right) is str else right.flatten()
+    parts = left.parts
+    if len(parts) != left.count:
+        parts = parts[:left.count]
+    parts.append(piece)
+    return Rope(parts, left.length + len(piece))
@@ -0,0 +1,151 @@
+import asyncio
+import threading
+
+from error import LoxRuntimeError, NativeError
+from natives import Task
+
+
+class Cancelled(Exception):
+    # Unwinds a suspended task when the run stops because of a runtime
+    # error elsewhere.
+    pass
+
+
+class Scheduler:
+    # Runs the program and the tasks it spawns cooperatively on an asyncio
+    # event loop (--async). The tree walker is plain recursive Python, so a
+    # task keeps its place in a Lox call by keeping its own thread, but
+    # only one thread runs at a time: the loop hands a task a semaphore to
+    # run on and blocks until the task hands one back by suspending in
+    # sleep() or await(), or by finishing. The interpreter therefore needs
+    # no locking and runs the same code as without --async. The one piece
+    # of interpreter state a task owns, its environment chain, is saved
+    # when it suspends and put back when it resumes.
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        self.lox = interpreter.lox
+        self.loop = None
+        self.current = None
+        self.drivers = set()
+        # Tasks spawned by the running task, to be started by the loop.
+        self.spawned = []
+
+    def run(self, statements):
+        self.interpreter.scheduler = self
+        try:
+            asyncio.run(self.main(statements))
+        finally:
+            self.interpreter.scheduler = None
+            self.interpreter.output.flush()
+
+    async def main(self, statements):
+        # The program ends when the main task and every task it spawned,
+        # directly or not, have finished.
+        self.loop = asyncio.get_running_loop()
+        self.start(Task(None), lambda: self.interpreter.interpret(statements))
+        while self.drivers:
+            done, pending = await asyncio.wait(
+                self.drivers, return_when=asyncio.FIRST_EXCEPTION)
+            self.drivers -= done
+            for driver in done:
+                if driver.exception() is not None:
+                    self.stop()
+                    if pending:
+                        await asyncio.wait(pending)
+                    raise driver.exception()
+
+    def start(self, task, body):
+        task.go = threading.Semaphore(0)
+        task.yielded = threading.Semaphore(0)
+        task.future = self.loop.create_future()
+        threading.Thread(target=self.runTask, args=(task, body),
+                         daemon=True).start()
+        self.drivers.add(self.loop.create_task(self.drive(task)))
+
+    def runTask(self, task, body):
+        # The body of a task's thread.
+        task.go.acquire()
+        self.interpreter.environment = self.interpreter.globals
+        try:
+            if not task.cancelled:
+                task.result = body()
+        except Cancelled:
+            pass
+        except LoxRuntimeError as error:
+            self.interpreter.output.flush()
+            self.lox.runtimeError(error)
+        except BaseException as exception:
+            task.exception = exception
+        finally:
+            task.done = True
+            task.request = None
+            task.yielded.release()
+
+    def resume(self, task):
+        # Runs the task until it next suspends or finishes, then starts the
+        # tasks it spawned. That happens here, on the loop's thread, before
+        # the task's request is looked at, so a task it awaits already has
+        # its future.
+        self.current = task
+        task.go.release()
+        task.yielded.acquire()
+        spawned = self.spawned
+        self.spawned = []
+        for child in spawned:
+            self.start(child, lambda child=child:
+                       child.function.call(self.interpreter, []))
+        if task.exception is not None:
+            raise task.exception
+
+    async def drive(self, task):
+        # A runtime error in any task stops them all: each one still
+        # suspended is resumed once more, to unwind.
+        try:
+            self.resume(task)
+            while task.request is not None and not self.lox.hadRuntimeError:
+                kind, value = task.request
+                if kind == "sleep":
+                    await asyncio.sleep(value)
+                else:
+                    await asyncio.shield(value.future)
+                self.resume(task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            if not task.done:
+                task.cancelled = True
+                self.resume(task)
+            task.future.set_result(None)
+            if self.lox.hadRuntimeError:
+                self.stop()
+
+    def stop(self):
+        for driver in self.drivers:
+            if driver is not asyncio.current_task():
+                driver.cancel()
+
+    # Called from the running task's thread.
+
+    def spawn(self, task):
+        # Futures and tasks of the event loop may only be made on its own
+        # thread, so the task is handed to resume() to start.
+        self.spawned.append(task)
+
+    def sleep(self, seconds):
+        self.suspend(("sleep", seconds))
+
+    def join(self, task):
+        if task is self.current:
+            raise NativeError("A task cannot await itself.")
+        self.suspend(("join", task))
+
+    def suspend(self, request):
+        task = self.current
+        interpreter = self.interpreter
+        task.environment = interpreter.environment
+        task.request = request
+        task.yielded.release()
+        task.go.acquire()
+        interpreter.environment = task.environment
+        if task.cancelled:
+            raise Cancelled()
@@ -0,0 +1,114 @@
+import sys
+import time
+
+from tokenType import TokenType
+from regexScanner import RegexScanner
+from parser import Parser
+from resolver import Resolver
+
+
+class ScanErrors:
+    # Stands in for Lox while an entry is checked for completeness, so that
+    # an unterminated string in a half-typed entry is not reported yet.
+    def __init__(self):
+        self.messages = []
+
+    def error(self, line, message):
+        self.messages.append(message)
+
+
+class Session:
+    # One interpreter, resolver and optimizer live for the whole REPL run,
+    # so globals defined by one entry are visible to the next and each entry
+    # only pays for scanning, parsing and resolving its own text. The python
+    # engine has no persistent state to run entries against, so it uses the
+    # tree interpreter here.
+    closers = {TokenType.SEMICOLON.value, TokenType.RIGHT_BRACE.value}
+    openers = {TokenType.LEFT_BRACE.value: 1, TokenType.RIGHT_BRACE.value: -1,
+               TokenType.LEFT_PAREN.value: 1, TokenType.RIGHT_PAREN.value: -1}
+    phases = ("scan", "parse", "resolve", "execute")
+
+    def __init__(self, lox):
+        self.lox = lox
+        self.interpreter = lox.createInterpreter()
+        self.resolver = Resolver(lox)
+        self.optimizer = None
+        if lox.optimize:
+            from optimizer import Optimizer
+            self.optimizer = Optimizer()
+        self.timings = None
+
+    def loop(self):
+        lines = []
+        while True:
+            try:
+                line = input("... " if lines else "> ")
+            except EOFError:
+                break
+
+            if not lines and line.strip().startswith(":"):
+                self.command(line.strip())
+                continue
+
+            # A blank line runs whatever has been typed so far, complete or
+            # not, so that a mistake can always be reported and left behind.
+            lines.append(line)
+            source = "\n".join(lines)
+            start = time.perf_counter()
+            tokens, complete = self.scan(source)
+            scanned = time.perf_counter() - start
+            if not complete and line.strip():
+                continue
+
+            lines = []
+            self.run(source, tokens, scanned)
+            self.lox.hadError = False
+            self.lox.hadRuntimeError = False
+
+    def command(self, command):
+        if command == ":time":
+            if self.timings is None:
+                print("No entry has been run yet.")
+                return
+            for phase, seconds in zip(self.phases, self.timings):
+                print("%-8s %10.3f ms" % (phase, seconds * 1000))
+        else:
+            print("Unknown command '" + command + "'.", file=sys.stderr)
+
+    def scan(self, source):
+        errors = ScanErrors()
+        tokens = RegexScanner(source, errors).scanTokens()
+        if "Unterminated string." in errors.messages:
+            return tokens, False
+        elif errors.messages:
+            return None, True
+
+        # The list ends with EOF, which is skipped.
+        depth = 0
+        for token in tokens:
+            depth += self.openers.get(token.type._value_, 0)
+        if depth > 0:
+            return tokens, False
+        return tokens, (len(tokens) == 1 or
+                        tokens[-2].type._value_ in self.closers)
+
+    def run(self, source, tokens, scanned):
+        start = time.perf_counter()
+        if tokens is None:
+            # Scan again, this time reporting the errors.
+            tokens = RegexScanner(source, self.lox).scanTokens()
+        statements = Parser(tokens, self.lox).parse()
+        parsed = time.perf_counter()
+
+        if not self.lox.hadError:
+            if self.optimizer is not None:
+                statements = self.optimizer.optimize(statements)
+            self.resolver.resolve(statements)
+        resolved = time.perf_counter()
+
+        if not self.lox.hadError:
+            self.interpreter.interpret(statements)
+        executed = time.perf_counter()
+
+        self.timings = (scanned, parsed - start, resolved - parsed,
+                        executed - resolved)
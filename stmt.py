@@ -1,56 +1,118 @@
-
-
 class Stmt:
-    pass
+    __slots__ = ()
 
 
-class Expression(Stmt):
-    def __init__(self, expression):
-        self.expression = expression
+class Block(Stmt):
+    __slots__ = ("statements", "size", "line")
+
+    def __init__(self, statements):
+        self.statements = statements
+        self.size = 0
+        self.line = 0
 
     def accept(self, visitor):
-        return visitor.visitExpressionStmt(self)
+        return visitor.visitBlockStmt(self)
 
 
-class Print(Stmt):
+class Expression(Stmt):
+    __slots__ = ("expression", "line")
+
     def __init__(self, expression):
         self.expression = expression
+        self.line = 0
 
     def accept(self, visitor):
-        return visitor.visitPrintStmt(self)
+        return visitor.visitExpressionStmt(self)
 
 
-class Var(Stmt):
-    def __init__(self, name, initializer):
-        self.name = name
+class For(Stmt):
+    __slots__ = ("initializer", "condition", "increment", "body", "size", "fresh", "line")
+
+    def __init__(self, initializer, condition, increment, body):
         self.initializer = initializer
+        self.condition = condition
+        self.increment = increment
+        self.body = body
+        self.size = 0
+        self.fresh = False
+        self.line = 0
 
     def accept(self, visitor):
-        return visitor.visitVarStmt(self)
+        return visitor.visitForStmt(self)
 
 
-class Block(Stmt):
-    def __init__(self, statements):
-        self.statements = statements
+class Function(Stmt):
+    __slots__ = ("name", "params", "body", "slot", "size", "pure", "line")
+
+    def __init__(self, name, params, body):
+        self.name = name
+        self.params = params
+        self.body = body
+        self.slot = None
+        self.size = 0
+        self.pure = False
+        self.line = 0
 
     def accept(self, visitor):
-        return visitor.visitBlockStmt(self)
+        return visitor.visitFunctionStmt(self)
 
 
 class If(Stmt):
+    __slots__ = ("condition", "thenBranch", "elseBranch", "line")
+
     def __init__(self, condition, thenBranch, elseBranch):
         self.condition = condition
         self.thenBranch = thenBranch
         self.elseBranch = elseBranch
+        self.line = 0
 
     def accept(self, visitor):
         return visitor.visitIfStmt(self)
 
 
+class Print(Stmt):
+    __slots__ = ("expression", "line")
+
+    def __init__(self, expression):
+        self.expression = expression
+        self.line = 0
+
+    def accept(self, visitor):
+        return visitor.visitPrintStmt(self)
+
+
+class Return(Stmt):
+    __slots__ = ("keyword", "value", "line")
+
+    def __init__(self, keyword, value):
+        self.keyword = keyword
+        self.value = value
+        self.line = 0
+
+    def accept(self, visitor):
+        return visitor.visitReturnStmt(self)
+
+
+class Var(Stmt):
+    __slots__ = ("name", "initializer", "slot", "line")
+
+    def __init__(self, name, initializer):
+        self.name = name
+        self.initializer = initializer
+        self.slot = None
+        self.line = 0
+
+    def accept(self, visitor):
+        return visitor.visitVarStmt(self)
+
+
 class While(Stmt):
+    __slots__ = ("condition", "body", "line")
+
     def __init__(self, condition, body):
         self.condition = condition
         self.body = body
+        self.line = 0
 
     def accept(self, visitor):
         return visitor.visitWhileStmt(self)
@@ -0,0 +1,96 @@
+import contextlib
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from lox import Lox
+from transpiler import Transpiler
+
+
+def run(engine, source, memoSize=None):
+    # Returns what running source prints to stdout and stderr.
+    lox = Lox(engine)
+    if memoSize is not None:
+        lox.memoSize = memoSize
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        lox.run(source)
+    return stdout.getvalue(), stderr.getvalue()
+
+
+class PythonEngineTest(unittest.TestCase):
+    def assertSameAsTree(self, source):
+        expected = run("tree", source)
+        self.assertEqual(run("python", source), expected)
+        return expected
+
+    def testNatives(self):
+        stdout, stderr = self.assertSameAsTree(
+            "var t = clock(); print t > 0; print clock;\n"
+            "clock = 1; print clock;\n")
+        self.assertEqual(stdout, "True\n<native fn>\n1\n")
+        self.assertEqual(stderr, "")
+
+    def testDeepLoopsFallBack(self):
+        # CPython compiles at most 20 nested loops in one function, so the
+        # transpiler gives up on deeper ones and they run on the tree
+        # interpreter instead.
+        source = ("var total = 0;\n" +
+                  "for (var i = 0; i < 2; i = i + 1) {\n" +
+                  "for (var j = 0; j < 1; j = j + 1) {\n" * 23 +
+                  "total = total + 1;\n" + "}\n" * 24 + "print total;\n")
+        lox = Lox("python")
+        transpiler = Transpiler(lox)
+        transpiler.transpile(lox.compile(source))
+        self.assertIsNotNone(transpiler.fallback)
+        self.assertEqual(self.assertSameAsTree(source), ("2\n", ""))
+
+    def testNativeArity(self):
+        stdout, stderr = self.assertSameAsTree("print clock(1);\n")
+        self.assertEqual(stderr,
+                         "Expected 0 arguments but got 1.\n[line 1]\n")
+
+
+ARRAYS = """var a = range(5);
+print a; print len(a);
+print a + 1; print a * a; print 10 - a; print a / 2; print a > 2; print -a;
+set(a, 0, 7);
+print get(a, 0); print sum(a); print min(a); print max(a);
+print a == a; print a == range(5); print array(3);
+print a + range(5) * 2;
+print a + range(2);
+"""
+
+
+class ArraysTest(unittest.TestCase):
+    def testEveryEngine(self):
+        expected = ("[0, 1, 2, 3, 4]\n5\n"
+                    "[1, 2, 3, 4, 5]\n[0, 1, 4, 9, 16]\n[10, 9, 8, 7, 6]\n"
+                    "[0, 0.5, 1, 1.5, 2]\n[0, 0, 0, 1, 1]\n[-0, -1, -2, -3, -4]\n"
+                    "7\n17\n1\n7\nTrue\nFalse\n[0, 0, 0]\n[7, 3, 6, 9, 12]\n")
+        for engine in Lox.engines:
+            with self.subTest(engine=engine):
+                stdout, stderr = run(engine, ARRAYS)
+                self.assertEqual(stdout, expected)
+                self.assertEqual(stderr,
+                                 "Arrays must have the same length.\n[line 8]\n")
+
+
+class MemoTest(unittest.TestCase):
+    def testSignedZero(self):
+        # 0 == -0, but a memo must not return neg(0) for neg(-0).
+        source = ("fun neg(x) { return -x; }\n"
+                  "print neg(0); print neg(-0); print neg(0);\n")
+        for engine in ("tree", "closure", "vm"):
+            with self.subTest(engine=engine):
+                memoized = run(engine, source)
+                self.assertEqual(memoized, run(engine, source, memoSize=0))
+                self.assertEqual(memoized, ("-0\n0\n-0\n", ""))
+
+
+if __name__ == "__main__":
+    unittest.main()
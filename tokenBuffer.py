@@ -0,0 +1,53 @@
+from array import array
+
+from tokenType import TokenType
+from loxToken import Token
+
+
+class TokenBuffer:
+    tokenTypes = {type.value: type for type in TokenType.members}
+    NUMBER = TokenType.NUMBER.value
+    STRING = TokenType.STRING.value
+
+    def __init__(self, source):
+        self.source = source
+        self.types = array("B")
+        self.starts = array("I")
+        self.lengths = array("I")
+        self.lines = array("I")
+
+    def __len__(self):
+        return len(self.types)
+
+    def append(self, type, start, length, line):
+        self.types.append(type)
+        self.starts.append(start)
+        self.lengths.append(length)
+        self.lines.append(line)
+
+    def type(self, index):
+        return self.tokenTypes[self.types[index]]
+
+    def lexeme(self, index):
+        start = self.starts[index]
+        return self.source[start:start + self.lengths[index]]
+
+    def literal(self, index):
+        type = self.types[index]
+        if type == self.NUMBER:
+            return float(self.lexeme(index))
+        elif type == self.STRING:
+            return self.lexeme(index)[1:-1]
+        return None
+
+    def token(self, index):
+        type = self.types[index]
+        start = self.starts[index]
+        lexeme = self.source[start:start + self.lengths[index]]
+        if type == self.NUMBER:
+            literal = float(lexeme)
+        elif type == self.STRING:
+            literal = lexeme[1:-1]
+        else:
+            literal = None
+        return Token(self.tokenTypes[type], lexeme, literal, self.lines[index])
@@ -0,0 +1,278 @@
+import ast
+
+from tokenType import TokenType
+from natives import natives
+
+
+class Transpiler:
+    arithmetic = {
+        TokenType.PLUS: (ast.Add, "add"),
+        TokenType.MINUS: (ast.Sub, "subtract"),
+        TokenType.STAR: (ast.Mult, "multiply"),
+        TokenType.SLASH: (ast.Div, "divide"),
+    }
+
+    comparisons = {
+        TokenType.GREATER: (ast.Gt, "greater"),
+        TokenType.GREATER_EQUAL: (ast.GtE, "greaterEqual"),
+        TokenType.LESS: (ast.Lt, "less"),
+        TokenType.LESS_EQUAL: (ast.LtE, "lessEqual"),
+    }
+
+    # CPython will not compile a function with more than 20 loops nested
+    # in it ("too many statically nested blocks").
+    maxLoopDepth = 20
+
+    nativeNames = frozenset(native.name for native in natives)
+
+    def __init__(self, lox):
+        self.lox = lox
+        self.scopes = []
+        self.globals = set()
+        # Natives the program reads, which main() binds as globals first.
+        self.natives = set()
+        self.counter = 0
+        self.loopDepth = 0
+        # Set to (line, reason) for a program that cannot be translated:
+        # one that declares a function, since Lox globals are locals of
+        # main() and a Lox function would need a closure over them, or one
+        # that nests loops too deeply. Lox.runPython then runs the program
+        # on the tree interpreter instead.
+        self.fallback = None
+
+    def transpile(self, statements):
+        body = self.block(statements)
+        body[:0] = [ast.Assign([self.store("l_" + name)],
+                               self.runtime("native", ast.Constant(name)))
+                    for name in sorted(self.natives)]
+
+        module = ast.parse(
+            "import loxRuntime as _rt\n"
+            "\n"
+            "def main():\n"
+            "    pass\n"
+            "\n"
+            "if __name__ == '__main__':\n"
+            "    import sys\n"
+            "    from error import LoxRuntimeError\n"
+            "    try:\n"
+            "        main()\n"
+            "    except LoxRuntimeError as error:\n"
+            "        _rt.output.flush()\n"
+            "        print(error.message + '\\n[line ' + str(error.token.line) + ']', file=sys.stderr)\n"
+            "        sys.exit(70)\n"
+            "    _rt.output.flush()\n")
+        module.body[1].body = body
+        return ast.fix_missing_locations(module)
+
+    def compile(self, statements, filename="<lox>"):
+        return compile(self.transpile(statements), filename, "exec")
+
+    def source(self, statements):
+        return ast.unparse(self.transpile(statements)) + "\n"
+
+    def block(self, statements):
+        body = []
+        for statement in statements:
+            body.extend(statement.accept(self))
+        if len(body) == 0:
+            body.append(ast.Pass())
+        return body
+
+    def temporary(self):
+        self.counter += 1
+        return "_t" + str(self.counter)
+
+    def load(self, name):
+        return ast.Name(name, ast.Load())
+
+    def store(self, name):
+        return ast.Name(name, ast.Store())
+
+    def runtime(self, function, *arguments):
+        return ast.Call(ast.Attribute(self.load("_rt"), function, ast.Load()),
+                        list(arguments), [])
+
+    def isFloat(self, name, value):
+        return ast.Compare(
+            ast.Call(self.load("type"),
+                     [ast.NamedExpr(self.store(name), value)], []),
+            [ast.Is()], [self.load("float")])
+
+    def isTruthy(self, name, value):
+        # Lox truthiness: everything except nil and false.
+        return ast.BoolOp(ast.And(), [
+            ast.Compare(ast.NamedExpr(self.store(name), value),
+                        [ast.IsNot()], [ast.Constant(None)]),
+            ast.Compare(self.load(name), [ast.IsNot()], [ast.Constant(False)]),
+        ])
+
+    def truthy(self, value):
+        return self.isTruthy(self.temporary(), value)
+
+    def resolve(self, name):
+        for scope in reversed(self.scopes):
+            if name.lexeme in scope:
+                return scope[name.lexeme]
+        if name.lexeme in self.globals:
+            return "l_" + name.lexeme
+        if name.lexeme in self.nativeNames:
+            self.natives.add(name.lexeme)
+            return "l_" + name.lexeme
+        return None
+
+    def visitExpressionStmt(self, stmt):
+        return [ast.Expr(stmt.expression.accept(self))]
+
+    def visitPrintStmt(self, stmt):
+        write = ast.Attribute(ast.Attribute(self.load("_rt"), "output",
+                                            ast.Load()), "write", ast.Load())
+        return [ast.Expr(ast.Call(write, [
+            self.runtime("stringify", stmt.expression.accept(self))], []))]
+
+    def visitVarStmt(self, stmt):
+        if stmt.initializer is not None:
+            value = stmt.initializer.accept(self)
+        else:
+            value = ast.Constant(None)
+
+        # The name is bound after the initializer is translated, so a local
+        # initializer still sees any outer variable of the same name.
+        if len(self.scopes) == 0:
+            self.globals.add(stmt.name.lexeme)
+            name = "l_" + stmt.name.lexeme
+        else:
+            self.counter += 1
+            name = "l" + str(self.counter) + "_" + stmt.name.lexeme
+            self.scopes[-1][stmt.name.lexeme] = name
+
+        return [ast.Assign([self.store(name)], value)]
+
+    def visitBlockStmt(self, stmt):
+        self.scopes.append({})
+        body = []
+        for statement in stmt.statements:
+            body.extend(statement.accept(self))
+        self.scopes.pop()
+        return body
+
+    def visitIfStmt(self, stmt):
+        test = self.truthy(stmt.condition.accept(self))
+        body = self.block([stmt.thenBranch])
+        orelse = []
+        if stmt.elseBranch is not None:
+            orelse = self.block([stmt.elseBranch])
+        return [ast.If(test, body, orelse)]
+
+    def visitWhileStmt(self, stmt):
+        test = self.truthy(stmt.condition.accept(self))
+        return [ast.While(test, self.loopBody(stmt, [stmt.body]), [])]
+
+    def loopBody(self, stmt, statements):
+        self.loopDepth += 1
+        if self.loopDepth > self.maxLoopDepth and self.fallback is None:
+            self.fallback = (stmt.line, "Loops nested more than " +
+                             str(self.maxLoopDepth) + " deep")
+        body = self.block(statements)
+        self.loopDepth -= 1
+        return body
+
+    def visitForStmt(self, stmt):
+        self.scopes.append({})
+        body = []
+        if stmt.initializer is not None:
+            body.extend(stmt.initializer.accept(self))
+        test = self.truthy(stmt.condition.accept(self))
+        loop = [stmt.body]
+        if stmt.increment is not None:
+            loop.append(stmt.increment)
+        body.append(ast.While(test, self.loopBody(stmt, loop), []))
+        self.scopes.pop()
+        return body
+
+    def visitLiteralExpr(self, expr):
+        return ast.Constant(expr.value)
+
+    def visitGroupingExpr(self, expr):
+        return expr.expression.accept(self)
+
+    def visitVariableExpr(self, expr):
+        name = self.resolve(expr.name)
+        if name is None:
+            return self.runtime("undefined", ast.Constant(expr.name.lexeme),
+                                ast.Constant(expr.name.line))
+        return self.load(name)
+
+    def visitAssignExpr(self, expr):
+        value = expr.value.accept(self)
+        name = self.resolve(expr.name)
+        if name is None:
+            return ast.Tuple([value, self.runtime(
+                "undefined", ast.Constant(expr.name.lexeme),
+                ast.Constant(expr.name.line))], ast.Load())
+        return ast.NamedExpr(self.store(name), value)
+
+    def visitUnaryExpr(self, expr):
+        right = expr.right.accept(self)
+        line = ast.Constant(expr.operator.line)
+        name = self.temporary()
+
+        if expr.operator.type == TokenType.MINUS:
+            return ast.IfExp(self.isFloat(name, right),
+                             ast.UnaryOp(ast.USub(), self.load(name)),
+                             self.runtime("negate", self.load(name), line))
+        else:
+            return ast.UnaryOp(ast.Not(), self.isTruthy(name, right))
+
+    def visitBinaryExpr(self, expr):
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        type = expr.operator.type
+
+        if type == TokenType.EQUAL_EQUAL:
+            return ast.Compare(left, [ast.Eq()], [right])
+        elif type == TokenType.BANG_EQUAL:
+            return ast.UnaryOp(ast.Not(), ast.Compare(left, [ast.Eq()], [right]))
+
+        a = self.temporary()
+        b = self.temporary()
+        # '&' rather than 'and' so both operands are always evaluated, left
+        # to right, before the guard decides between the fast path and the
+        # checking helper in loxRuntime.
+        guard = ast.BinOp(self.isFloat(a, left), ast.BitAnd(),
+                          self.isFloat(b, right))
+        if type == TokenType.SLASH:
+            # A zero divisor takes the helper, which reports it.
+            guard = ast.BinOp(guard, ast.BitAnd(), ast.Compare(
+                self.load(b), [ast.NotEq()], [ast.Constant(0.0)]))
+        if type in self.arithmetic:
+            op, helper = self.arithmetic[type]
+            fast = ast.BinOp(self.load(a), op(), self.load(b))
+        else:
+            op, helper = self.comparisons[type]
+            fast = ast.Compare(self.load(a), [op()], [self.load(b)])
+
+        return ast.IfExp(guard, fast, self.runtime(
+            helper, self.load(a), self.load(b),
+            ast.Constant(expr.operator.line)))
+
+    def visitLogicalExpr(self, expr):
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        name = self.temporary()
+
+        if expr.operator.type == TokenType.OR:
+            return ast.IfExp(self.isTruthy(name, left), self.load(name), right)
+        else:
+            return ast.IfExp(self.isTruthy(name, left), right, self.load(name))
+
+    def visitFunctionStmt(self, stmt):
+        if self.fallback is None:
+            self.fallback = (stmt.name.line, "Function declarations")
+        return []
+
+    def visitCallExpr(self, expr):
+        callee = expr.callee.accept(self)
+        arguments = [argument.accept(self) for argument in expr.arguments]
+        return self.runtime("call", callee, ast.List(arguments, ast.Load()),
+                            ast.Constant(expr.paren.line))
@@ -0,0 +1,449 @@
+import sys
+
+from bytecode import OpCode
+from compiler import Compiler
+from environment import GlobalEnvironment
+from error import LoxRuntimeError, NativeError
+from interpreter import Interpreter
+from loxCallable import LoxCallable
+from loxFunction import Closure, Memo, memoKey
+from natives import defineNatives
+from loxArray import LoxArray
+from rope import concat, strings
+from output import Output, formatNumber
+
+
+class Upvalue:
+    # A variable captured by a closure. While the function that declared it
+    # is running it lives in that function's stack slot; when the slot goes
+    # away it is closed, by moving the value into a list of its own, so
+    # that reading one is always stack[index].
+    __slots__ = ("stack", "index")
+
+    def __init__(self, stack, index):
+        self.stack = stack
+        self.index = index
+
+    def close(self):
+        self.stack = [self.stack[self.index]]
+        self.index = 0
+
+
+def closeUpvalues(openUpvalues, last):
+    # Closes the open upvalues of every stack slot from last up.
+    for index in [index for index in openUpvalues if index >= last]:
+        openUpvalues.pop(index).close()
+
+
+class VM:
+    # Each Lox call pushes a frame rather than a Python frame, so this
+    # bounds recursion instead of the interpreter's recursion limit.
+    maxFrames = 100000
+
+    def __init__(self, lox):
+        self.lox = lox
+        globals = GlobalEnvironment()
+        defineNatives(globals)
+        self.globals = globals.values
+        self.memos = lox.memos
+        self.memoSize = lox.memoSize
+        self.output = Output(sys.stdout, lox.lineBuffered)
+        # Set while a Scheduler runs this VM's tasks (--async).
+        self.scheduler = None
+
+    def interpret(self, statements):
+        script = Compiler(self.lox).compile(statements)
+        if self.lox.hadError:
+            return
+
+        try:
+            self.run(Closure(script, ()), [])
+        except LoxRuntimeError as error:
+            self.output.flush()
+            self.lox.runtimeError(error)
+        finally:
+            self.output.flush()
+
+    def memoize(self, closure, owner):
+        # As Interpreter.memoize: closures of a pure function share one memo
+        # per compiled function.
+        if self.memoSize <= 0 or closure.memo is not None:
+            return
+        memo = self.memos.get(owner)
+        if memo is None:
+            memo = self.memos[owner] = Memo(
+                closure.function.name.lexeme, self.memoSize)
+        closure.memo = memo
+
+    # run() handles two float operands itself and passes anything else to
+    # the tree interpreter's handlers, which read no interpreter state, so
+    # mixed operands, arrays and errors behave the same on both engines.
+    add = Interpreter.add
+    subtract = Interpreter.subtract
+    multiply = Interpreter.multiply
+    divide = Interpreter.divide
+    greater = Interpreter.greater
+    greaterEqual = Interpreter.greaterEqual
+    less = Interpreter.less
+    lessEqual = Interpreter.lessEqual
+    negate = Interpreter.negate
+    elementwise = Interpreter.elementwise
+    checkNumberOperand = Interpreter.checkNumberOperand
+    checkNumberOperands = Interpreter.checkNumberOperands
+
+    def arityError(self, paren, arity, count):
+        raise LoxRuntimeError(paren, "Expected " + str(arity) +
+                              " arguments but got " + str(count) + ".")
+
+    def stringify(self, object):
+        if type(object) is float:
+            return formatNumber(object)
+        elif object is None:
+            return "nil"
+        return str(object)
+
+    def run(self, closure, arguments):
+        # Calls closure and runs until it returns. The stack holds the
+        # callee and then the arguments and locals of each active call;
+        # base is the slot of the running function's first parameter. A
+        # call saves the caller's state in frames and a return restores it.
+        # Each run has a stack of its own, so a native that calls back into
+        # Lox, as spawn() does, can start another one. pending holds the
+        # (memo, key) pairs the running call's result is to be stored under.
+        function = closure.function
+        pending = None
+        memo = closure.memo
+        if memo is not None:
+            key = memoKey(arguments)
+            if LoxArray not in key:
+                if key in memo.results:
+                    memo.hits += 1
+                    memo.results.move_to_end(key)
+                    return memo.results[key]
+                memo.misses += 1
+                pending = [(memo, key)]
+
+        code = function.code
+        constants = function.constants
+        tokens = function.tokens
+        upvalues = closure.upvalues
+        stack = [closure, *arguments]
+        base = 1
+        frames = []
+        openUpvalues = {}
+        maxFrames = self.maxFrames
+        globals = self.globals
+        push = stack.append
+        pop = stack.pop
+        write = self.output.write
+
+        CONSTANT = OpCode.CONSTANT
+        NIL = OpCode.NIL
+        TRUE = OpCode.TRUE
+        FALSE = OpCode.FALSE
+        POP = OpCode.POP
+        POP_N = OpCode.POP_N
+        GET_LOCAL = OpCode.GET_LOCAL
+        SET_LOCAL = OpCode.SET_LOCAL
+        GET_GLOBAL = OpCode.GET_GLOBAL
+        DEFINE_GLOBAL = OpCode.DEFINE_GLOBAL
+        SET_GLOBAL = OpCode.SET_GLOBAL
+        EQUAL = OpCode.EQUAL
+        NOT_EQUAL = OpCode.NOT_EQUAL
+        GREATER = OpCode.GREATER
+        GREATER_EQUAL = OpCode.GREATER_EQUAL
+        LESS = OpCode.LESS
+        LESS_EQUAL = OpCode.LESS_EQUAL
+        ADD = OpCode.ADD
+        SUBTRACT = OpCode.SUBTRACT
+        MULTIPLY = OpCode.MULTIPLY
+        DIVIDE = OpCode.DIVIDE
+        NOT = OpCode.NOT
+        NEGATE = OpCode.NEGATE
+        PRINT = OpCode.PRINT
+        JUMP = OpCode.JUMP
+        JUMP_IF_FALSE = OpCode.JUMP_IF_FALSE
+        JUMP_IF_TRUE = OpCode.JUMP_IF_TRUE
+        POP_JUMP_IF_FALSE = OpCode.POP_JUMP_IF_FALSE
+        CALL = OpCode.CALL
+        RETURN = OpCode.RETURN
+        TAIL_CALL = OpCode.TAIL_CALL
+        CLOSURE = OpCode.CLOSURE
+        GET_UPVALUE = OpCode.GET_UPVALUE
+        SET_UPVALUE = OpCode.SET_UPVALUE
+        CLOSE_UPVALUE = OpCode.CLOSE_UPVALUE
+
+        ip = 0
+
+        while True:
+            op = code[ip]
+
+            # The opcodes are tested roughly in the order of how often the
+            # programs under benchmarks/ execute them.
+            if op == GET_LOCAL:
+                push(stack[base + code[ip + 1]])
+                ip += 2
+            elif op == CONSTANT:
+                push(constants[code[ip + 1]])
+                ip += 2
+            elif op == POP:
+                pop()
+                ip += 1
+            elif op == ADD:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left + right
+                elif isinstance(left, strings) and isinstance(right, strings):
+                    stack[-1] = concat(left, right)
+                else:
+                    stack[-1] = self.add(tokens[ip], left, right)
+                ip += 1
+            elif op == GET_GLOBAL:
+                try:
+                    push(globals[constants[code[ip + 1]]])
+                except KeyError:
+                    raise LoxRuntimeError(
+                        tokens[ip], "Undefined variable '" +
+                        constants[code[ip + 1]] + "'.") from None
+                ip += 2
+            elif op == POP_JUMP_IF_FALSE:
+                value = pop()
+                if value is None or value is False:
+                    ip = code[ip + 1]
+                else:
+                    ip += 2
+            elif op == SET_LOCAL:
+                stack[base + code[ip + 1]] = stack[-1]
+                ip += 2
+            elif op == LESS:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left < right
+                else:
+                    stack[-1] = self.less(tokens[ip], left, right)
+                ip += 1
+            elif op == JUMP:
+                ip = code[ip + 1]
+            elif op == SET_GLOBAL:
+                name = constants[code[ip + 1]]
+                if name not in globals:
+                    raise LoxRuntimeError(
+                        tokens[ip], "Undefined variable '" + name + "'.")
+                globals[name] = stack[-1]
+                ip += 2
+            elif op == SUBTRACT:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left - right
+                else:
+                    stack[-1] = self.subtract(tokens[ip], left, right)
+                ip += 1
+            elif op == EQUAL:
+                right = pop()
+                stack[-1] = stack[-1] == right
+                ip += 1
+            elif op == CALL or op == TAIL_CALL:
+                count = code[ip + 1]
+                first = len(stack) - count
+                callee = stack[first - 1]
+
+                if type(callee) is not Closure:
+                    if not isinstance(callee, LoxCallable):
+                        raise LoxRuntimeError(
+                            tokens[ip], "Can only call functions and classes.")
+                    if count != callee.arity():
+                        self.arityError(tokens[ip], callee.arity(), count)
+                    try:
+                        value = callee.call(self, stack[first:])
+                    except NativeError as error:
+                        raise LoxRuntimeError(tokens[ip], error.message)
+                    del stack[first - 1:]
+                    push(value)
+                    ip += 2
+                    continue
+
+                function = callee.function
+                if count != function.arity:
+                    self.arityError(tokens[ip], function.arity, count)
+
+                # As in Interpreter.callFunction, a hit replaces the call
+                # with its result, and a miss is stored on return.
+                memo = callee.memo
+                if memo is not None:
+                    key = memoKey(stack[first:])
+                    if LoxArray in key:
+                        memo = None
+                    elif key in memo.results:
+                        memo.hits += 1
+                        memo.results.move_to_end(key)
+                        value = memo.results[key]
+                        del stack[first - 1:]
+                        push(value)
+                        ip += 2
+                        continue
+                    else:
+                        memo.misses += 1
+
+                if op == CALL:
+                    if len(frames) >= maxFrames:
+                        raise LoxRuntimeError(function.name, "Stack overflow.")
+                    frames.append((code, constants, tokens, upvalues, ip + 2,
+                                   base, pending))
+                    pending = None
+                    base = first
+                else:
+                    # A tail call reuses the returning function's frame.
+                    if openUpvalues:
+                        closeUpvalues(openUpvalues, base)
+                    stack[base - 1:] = stack[first - 1:]
+
+                if memo is not None:
+                    if pending is None:
+                        pending = []
+                    pending.append((memo, key))
+
+                code = function.code
+                constants = function.constants
+                tokens = function.tokens
+                upvalues = callee.upvalues
+                ip = 0
+            elif op == RETURN:
+                value = pop()
+                if openUpvalues:
+                    closeUpvalues(openUpvalues, base)
+                if pending is not None:
+                    for memo, key in pending:
+                        memo.store(key, value)
+                del stack[base - 1:]
+                if not frames:
+                    return value
+
+                push(value)
+                code, constants, tokens, upvalues, ip, base, pending = (
+                    frames.pop())
+            elif op == PRINT:
+                write(self.stringify(pop()))
+                ip += 1
+            elif op == GET_UPVALUE:
+                upvalue = upvalues[code[ip + 1]]
+                push(upvalue.stack[upvalue.index])
+                ip += 2
+            elif op == JUMP_IF_FALSE:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip = code[ip + 1]
+                else:
+                    ip += 2
+            elif op == NOT_EQUAL:
+                right = pop()
+                stack[-1] = not stack[-1] == right
+                ip += 1
+            elif op == DIVIDE:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float and right:
+                    stack[-1] = left / right
+                else:
+                    # A zero divisor is reported there.
+                    stack[-1] = self.divide(tokens[ip], left, right)
+                ip += 1
+            elif op == GREATER:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left > right
+                else:
+                    stack[-1] = self.greater(tokens[ip], left, right)
+                ip += 1
+            elif op == MULTIPLY:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left * right
+                else:
+                    stack[-1] = self.multiply(tokens[ip], left, right)
+                ip += 1
+            elif op == GREATER_EQUAL:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left >= right
+                else:
+                    stack[-1] = self.greaterEqual(tokens[ip], left, right)
+                ip += 1
+            elif op == LESS_EQUAL:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left <= right
+                else:
+                    stack[-1] = self.lessEqual(tokens[ip], left, right)
+                ip += 1
+            elif op == JUMP_IF_TRUE:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip += 2
+                else:
+                    ip = code[ip + 1]
+            elif op == NIL:
+                push(None)
+                ip += 1
+            elif op == TRUE:
+                push(True)
+                ip += 1
+            elif op == FALSE:
+                push(False)
+                ip += 1
+            elif op == NOT:
+                value = stack[-1]
+                stack[-1] = value is None or value is False
+                ip += 1
+            elif op == NEGATE:
+                value = stack[-1]
+                if type(value) is float:
+                    stack[-1] = -value
+                else:
+                    stack[-1] = self.negate(tokens[ip], value)
+                ip += 1
+            elif op == DEFINE_GLOBAL:
+                globals[constants[code[ip + 1]]] = pop()
+                ip += 2
+            elif op == POP_N:
+                del stack[-code[ip + 1]:]
+                ip += 2
+            elif op == SET_UPVALUE:
+                upvalue = upvalues[code[ip + 1]]
+                upvalue.stack[upvalue.index] = stack[-1]
+                ip += 2
+            elif op == CLOSURE:
+                # Each (isLocal, index) pair after the operand captures a
+                # slot of this frame, sharing the upvalue of any closure
+                # that captured it already, or one of this closure's own.
+                function = constants[code[ip + 1]]
+                ip += 2
+                captured = []
+                for upvalue in range(function.upvalueCount):
+                    if code[ip]:
+                        index = base + code[ip + 1]
+                        upvalue = openUpvalues.get(index)
+                        if upvalue is None:
+                            upvalue = openUpvalues[index] = Upvalue(stack,
+                                                                    index)
+                    else:
+                        upvalue = upvalues[code[ip + 1]]
+                    captured.append(upvalue)
+                    ip += 2
+
+                closure = Closure(function, captured)
+                if function.pure:
+                    self.memoize(closure, function)
+                push(closure)
+            elif op == CLOSE_UPVALUE:
+                upvalue = openUpvalues.pop(len(stack) - 1, None)
+                if upvalue is not None:
+                    upvalue.close()
+                pop()
+                ip += 1